@@ -0,0 +1,45 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    raw = f'{row["pub_date"].isoformat()}|{row["id"]}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        pub_date, pk = raw.split('|')
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+def paginate(querysets, cursor, limit):
+    """Страница ленты по курсору (pub_date, id) без OFFSET.
+
+    Лента отсортирована по (-pub_date, -id), курсор указывает на
+    последнюю строку предыдущей страницы. querysets читаются по очереди
+    (свежие посты, затем архив), пока страница не заполнится.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    rows = []
+    for queryset in querysets:
+        queryset = queryset.order_by('-pub_date', '-id')
+        if position:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            )
+        rows += queryset[:limit + 1 - len(rows)]
+        if len(rows) > limit:
+            break
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
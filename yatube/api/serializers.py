@@ -0,0 +1,45 @@
+from django.conf import settings
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'excerpt': 'excerpt',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+    'parent': 'parent_id',
+    'depth': 'depth',
+}
+CURSOR_COLUMNS = ('id', 'pub_date')
+
+
+def parse_fields(value, available):
+    """Поля из ?fields=a,b; без параметра — все доступные."""
+    if not value:
+        return list(available)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise KeyError(', '.join(sorted(unknown)))
+    return fields
+
+
+def columns(fields, available, extra=()):
+    return list({available[field] for field in fields} | set(extra))
+
+
+def serialize(row, fields, available):
+    """Строка values() -> словарь ответа только с запрошенными полями."""
+    item = {field: row[available[field]] for field in fields}
+    if item.get('image') is not None:
+        item['image'] = (
+            settings.MEDIA_URL + item['image'] if item['image'] else None
+        )
+    return item
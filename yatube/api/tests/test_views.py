@@ -0,0 +1,105 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ApiFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='test-title',
+            slug='test-slug',
+            description='test-description'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'test-text{i}',
+                author=cls.author,
+                group=cls.group if i % 2 else None
+            )
+            for i in range(7)
+        ]
+        Comment.objects.create(
+            text='test-comment', author=cls.author, post=cls.posts[0]
+        )
+
+    def test_cursor_pagination_walks_whole_feed(self):
+        """Курсор проходит ленту без пропусков и повторов."""
+        url = reverse('api:post_list')
+        seen = []
+        cursor = ''
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(
+                    url, {'limit': 3, 'cursor': cursor}
+                ).json()
+            self.assertLessEqual(len(queries), 2)
+            seen += [item['id'] for item in data['results']]
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts)])
+
+    def test_feed_continues_into_archive(self):
+        call_command('archive_posts', days=-1, stdout=StringIO())
+        Post.objects.create(text='test-fresh', author=self.author)
+        url = reverse('api:post_list')
+        first = self.client.get(url, {'limit': 4}).json()
+        second = self.client.get(
+            url, {'limit': 4, 'cursor': first['next']}
+        ).json()
+        self.assertEqual(
+            [item['text'] for item in first['results'] + second['results']],
+            ['test-fresh'] + [f'test-text{i}' for i in reversed(range(7))]
+        )
+        detail = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': self.posts[0].pk})
+        ).json()
+        self.assertEqual(detail['comments'][0]['text'], 'test-comment')
+
+    def test_sparse_fieldsets(self):
+        data = self.client.get(
+            reverse('api:post_list'), {'fields': 'id,author'}
+        ).json()
+        self.assertEqual(
+            data['results'][0],
+            {'id': self.posts[-1].pk, 'author': 'test-author'}
+        )
+
+    def test_group_and_profile_feeds(self):
+        group_data = self.client.get(
+            reverse('api:group_posts', kwargs={'slug': 'test-slug'})
+        ).json()
+        self.assertEqual(len(group_data['results']), 3)
+        self.assertEqual(group_data['results'][0]['group'], 'test-slug')
+        profile_data = self.client.get(
+            reverse('api:profile_posts', kwargs={'username': 'test-author'})
+        ).json()
+        self.assertEqual(len(profile_data['results']), 7)
+
+    def test_post_detail_with_comments(self):
+        data = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': self.posts[0].pk})
+        ).json()
+        self.assertEqual(data['text'], 'test-text0')
+        self.assertEqual(data['comments'][0]['text'], 'test-comment')
+
+    def test_bad_requests(self):
+        url = reverse('api:post_list')
+        for params in ({'fields': 'password'}, {'cursor': 'broken'},
+                       {'limit': 1000}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -0,0 +1,142 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from core.models import ChangeEvent
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Group,
+                          Post, User)
+
+from .pagination import InvalidCursor, paginate
+from .serializers import (COMMENT_FIELDS, CURSOR_COLUMNS, POST_FIELDS,
+                          columns, parse_fields, serialize)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')}
+    )
+
+
+def error(detail):
+    return json_response({'detail': detail}, status=400)
+
+
+def parse_limit(value):
+    limit = int(value) if value else DEFAULT_LIMIT
+    if not 0 < limit <= MAX_LIMIT:
+        raise ValueError(limit)
+    return limit
+
+
+def feed(request, **filters):
+    try:
+        fields = parse_fields(request.GET.get('fields'), POST_FIELDS)
+        limit = parse_limit(request.GET.get('limit'))
+        selected = columns(fields, POST_FIELDS, extra=CURSOR_COLUMNS)
+        rows, next_cursor = paginate(
+            [
+                Post.objects.filter(**filters).values(*selected),
+                ArchivedPost.objects.filter(**filters).values(*selected),
+            ],
+            request.GET.get('cursor'),
+            limit
+        )
+    except KeyError as unknown:
+        return error(f'Неизвестные поля: {unknown.args[0]}')
+    except InvalidCursor:
+        return error('Некорректный курсор')
+    except ValueError:
+        return error(f'limit должен быть от 1 до {MAX_LIMIT}')
+    return json_response({
+        'results': [serialize(row, fields, POST_FIELDS) for row in rows],
+        'next': next_cursor,
+    })
+
+
+@require_GET
+def post_list(request):
+    return feed(request)
+
+
+@require_GET
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return feed(request, group=group)
+
+
+@require_GET
+def profile_posts(request, username):
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return feed(request, author=author)
+
+
+@require_GET
+def post_detail(request, post_id):
+    try:
+        fields = parse_fields(request.GET.get('fields'), POST_FIELDS)
+    except KeyError as unknown:
+        return error(f'Неизвестные поля: {unknown.args[0]}')
+    for post_model, comment_model in (
+        (Post, Comment), (ArchivedPost, ArchivedComment)
+    ):
+        row = post_model.objects.filter(pk=post_id).values(
+            *columns(fields, POST_FIELDS)
+        ).first()
+        if row is not None:
+            break
+    else:
+        raise Http404
+    comments = comment_model.objects.filter(post_id=post_id).order_by(
+        'path'
+    ).values(*COMMENT_FIELDS.values())
+    data = serialize(row, fields, POST_FIELDS)
+    data['comments'] = [
+        serialize(comment, COMMENT_FIELDS, COMMENT_FIELDS)
+        for comment in comments
+    ]
+    return json_response(data)
+
+
+@require_GET
+def changes(request):
+    """События журнала изменений с номером больше since.
+
+    Клиент сохраняет last из ответа и передаёт его в следующий запрос.
+    В журнале есть подписки, поэтому доступ — по заголовку
+    «Authorization: Bearer <CHANGES_TOKEN>» или сотруднику.
+    """
+    token = settings.CHANGES_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = bool(token) and constant_time_compare(
+        header, f'Bearer {token}'
+    )
+    if not (authorized or request.user.is_staff):
+        raise PermissionDenied
+    try:
+        since = int(request.GET.get('since', 0))
+        limit = parse_limit(request.GET.get('limit'))
+    except ValueError:
+        return error(f'since — целое число, limit — от 1 до {MAX_LIMIT}')
+    events = list(
+        ChangeEvent.objects.filter(pk__gt=since).values(
+            'id', 'model', 'object_id', 'action', 'data', 'created'
+        )[:limit]
+    )
+    for event in events:
+        event['data'] = json.loads(event['data']) if event['data'] else None
+    return json_response({
+        'results': events,
+        'last': events[-1]['id'] if events else since,
+    })
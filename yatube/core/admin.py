@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'queue', 'status', 'attempts', 'run_at')
+    list_filter = ('queue', 'status')
+    search_fields = ('name', 'idempotency_key')
+
+
+admin.site.register(Task, TaskAdmin)
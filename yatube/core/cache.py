@@ -0,0 +1,126 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.core.cache.backends import filebased, locmem
+from django.core.files import locks
+from django.core.files.move import file_move_safe
+
+from . import metrics
+
+MISSING = object()
+
+local_lock = threading.RLock()
+
+
+class InstrumentedMixin:
+    """Считает попадания и промахи чтений кеша в core.metrics."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version)
+        metrics.cache_read(key, value is not MISSING)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        found = super().get_many(keys, version)
+        for key in keys:
+            metrics.cache_read(key, key in found)
+        return found
+
+
+class LocMemCache(InstrumentedMixin, locmem.LocMemCache):
+    def locked(self):
+        """Как FileCache.locked(), но в пределах процесса."""
+        return local_lock
+
+
+class FileCache(InstrumentedMixin, filebased.FileBasedCache):
+    """Кеш в файлах, общий для всех воркеров одной машины.
+
+    В FileBasedCache add() и incr() — это чтение и запись без
+    блокировки; здесь они выполняются под файловой блокировкой, поэтому
+    атомарны и между процессами.
+
+    FileBasedCache перед каждой записью перечисляет весь каталог, чтобы
+    проверить MAX_ENTRIES, и запись дорожает с ростом кеша. Здесь
+    проверка идёт раз в OPTIONS['CULL_EVERY'] записей процесса: кеш может
+    ненадолго превысить MAX_ENTRIES на столько же записей от процесса.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_every = int(
+            params.get('OPTIONS', {}).get('CULL_EVERY', 1000)
+        )
+        self._writes = 0
+
+    def _cull(self):
+        self._writes += 1
+        if self._writes % self._cull_every == 0:
+            super()._cull()
+
+    @contextmanager
+    def locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, 'lock'), 'ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(file)
+
+    def add(self, key, value, timeout=filebased.DEFAULT_TIMEOUT,
+            version=None):
+        with self.locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        """Меняет число, не продлевая срок жизни ключа."""
+        fname = self._key_to_file(key, version)
+        with self.locked():
+            try:
+                with open(fname, 'rb') as file:
+                    if self._is_expired(file):
+                        raise ValueError(f"Key '{key}' not found")
+                    file.seek(0)
+                    expiry = pickle.load(file)
+                    value = pickle.loads(zlib.decompress(file.read()))
+            except FileNotFoundError:
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            fd, temporary = tempfile.mkstemp(dir=self._dir)
+            with open(fd, 'wb') as file:
+                file.write(pickle.dumps(expiry, self.pickle_protocol))
+                file.write(zlib.compress(
+                    pickle.dumps(value, self.pickle_protocol)
+                ))
+            file_move_safe(temporary, fname, allow_overwrite=True)
+        return value
+
+
+@contextmanager
+def lock(key, timeout=5, wait=1, alias='shared'):
+    """Блокировка на ключе общего кеша, видимая всем воркерам.
+
+    Выдаёт True, если блокировка взята, и False, если за wait секунд
+    этого не случилось: вызывающий код решает, как обойтись без неё.
+    timeout ограничивает жизнь блокировки упавшего процесса.
+    """
+    cache = caches[alias]
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    acquired = cache.add(key, token, timeout)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.01)
+        acquired = cache.add(key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
@@ -0,0 +1,74 @@
+import json
+import threading
+from contextlib import contextmanager
+
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
+
+from .models import ChangeEvent
+
+state = threading.local()
+
+
+def label(model):
+    return model._meta.label_lower
+
+
+def snapshot(instance):
+    fields = serializers.serialize('python', [instance])[0]['fields']
+    return json.dumps(fields, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def is_muted():
+    return getattr(state, 'muted', False)
+
+
+def saved(sender, instance, created, raw=False, **kwargs):
+    if raw or is_muted():
+        return
+    ChangeEvent.objects.create(
+        model=label(sender),
+        object_id=instance.pk,
+        action=ChangeEvent.CREATE if created else ChangeEvent.UPDATE,
+        data=snapshot(instance)
+    )
+
+
+def deleted(sender, instance, **kwargs):
+    if is_muted():
+        return
+    ChangeEvent.objects.create(
+        model=label(sender),
+        object_id=instance.pk,
+        action=ChangeEvent.DELETE
+    )
+
+
+def track(*models):
+    """Записывает в журнал изменения моделей, сделанные через ORM.
+
+    Изменения через QuerySet.update() и «сырые» удаления сигналов не
+    посылают, их код должен сам вызвать record_many().
+    """
+    for model in models:
+        post_save.connect(saved, sender=model, dispatch_uid=label(model))
+        post_delete.connect(deleted, sender=model, dispatch_uid=label(model))
+
+
+def record_many(model, ids, action):
+    """События для набора строк, изменённых одним запросом."""
+    ChangeEvent.objects.bulk_create(
+        ChangeEvent(model=label(model), object_id=pk, action=action)
+        for pk in ids
+    )
+
+
+@contextmanager
+def muted():
+    """Не писать события из сигналов: вызывающий код запишет их сам."""
+    state.muted = True
+    try:
+        yield
+    finally:
+        state.muted = False
@@ -0,0 +1,52 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    message = str(error)
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def atomic_retry(func=None, attempts=5, delay=0.05):
+    """Выполняет func в транзакции и повторяет её, если база занята.
+
+    busy_timeout не спасает транзакцию, которая начала с чтения и
+    потом пытается писать: SQLite сразу отвечает «database is locked».
+    Такую транзакцию можно только откатить и начать заново, поэтому
+    повтор — с экспоненциальной паузой со случайным разбросом. Внутри
+    уже открытой транзакции повторять нельзя, там ошибка пробрасывается.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    with transaction.atomic():
+                        return func(*args, **kwargs)
+                except OperationalError as error:
+                    last = attempt == attempts - 1
+                    if not is_locked(error) or last or (
+                        connection.in_atomic_block
+                    ):
+                        raise
+                time.sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,146 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import is_locked
+
+PROFILES = {
+    'default': {'pragmas': {}, 'persistent': False, 'retries': 0},
+    'production': {
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'persistent': True,
+        'retries': 5,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентное чтение и запись в SQLite с настройками '
+        'по умолчанию и с производственным профилем.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Длительность прогона каждого профиля в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        for name, profile in PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                prepare(path)
+                stats = run(path, profile, options)
+            duration = options['duration']
+            self.stdout.write(
+                f'{name:>10}: чтений {stats["reads"] / duration:8.0f}/с, '
+                f'записей {stats["writes"] / duration:6.0f}/с, '
+                f'ошибок «locked» {stats["errors"]}'
+            )
+
+
+def prepare(path):
+    db = sqlite3.connect(path)
+    db.execute(
+        'CREATE TABLE comment (id INTEGER PRIMARY KEY, '
+        'post_id INTEGER, text TEXT)'
+    )
+    db.execute('CREATE INDEX comment_post ON comment (post_id)')
+    db.executemany(
+        'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+        ((i % 500, 'x' * 200) for i in range(20000))
+    )
+    db.commit()
+    db.close()
+
+
+def connect(path, pragmas):
+    db = sqlite3.connect(path, timeout=5, isolation_level=None)
+    for name, value in pragmas.items():
+        db.execute(f'PRAGMA {name} = {value}')
+    return db
+
+
+def read(db):
+    db.execute(
+        'SELECT id, text FROM comment WHERE post_id = ? LIMIT 10',
+        (random.randrange(500),)
+    ).fetchall()
+
+
+def write(db):
+    """Как add_comment: чтение и запись в одной транзакции."""
+    post_id = random.randrange(500)
+    db.execute('BEGIN')
+    try:
+        db.execute(
+            'SELECT count(*) FROM comment WHERE post_id = ?', (post_id,)
+        ).fetchone()
+        db.execute(
+            'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+            (post_id, 'y' * 200)
+        )
+        db.execute('COMMIT')
+    except sqlite3.OperationalError:
+        db.execute('ROLLBACK')
+        raise
+
+
+def worker(path, profile, operation, deadline, stats, key, lock):
+    done = errors = 0
+    db = connect(path, profile['pragmas'])
+    while time.monotonic() < deadline:
+        if not profile['persistent']:
+            db.close()
+            db = connect(path, profile['pragmas'])
+        for attempt in range(profile['retries'] + 1):
+            try:
+                operation(db)
+                done += 1
+                break
+            except sqlite3.OperationalError as error:
+                if not is_locked(error):
+                    raise
+                if attempt == profile['retries']:
+                    errors += 1
+                else:
+                    time.sleep(
+                        0.005 * 2 ** attempt * random.uniform(0.5, 1.5)
+                    )
+    db.close()
+    with lock:
+        stats[key] += done
+        stats['errors'] += errors
+
+
+def run(path, profile, options):
+    stats = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + options['duration']
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(path, profile, operation, deadline, stats, key, lock)
+        )
+        for operation, key, count in (
+            (read, 'reads', options['readers']),
+            (write, 'writes', options['writers']),
+        )
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
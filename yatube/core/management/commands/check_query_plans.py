@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core import queryplans
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает все страницы posts на засеянной тестовой базе и '
+        'сравнивает проблемы в планах запросов с базовой линией.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Записать текущие проблемы как новую базовую линию.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            findings = queryplans.collect()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        if options['update']:
+            queryplans.save_baseline(findings)
+            total = sum(len(issues) for issues in findings.values())
+            self.stdout.write(f'Базовая линия обновлена: проблем {total}')
+            return
+        regressions, fixed = queryplans.compare(
+            findings, queryplans.load_baseline()
+        )
+        if fixed:
+            self.stdout.write(
+                'Исчезли проблемы (обновите базовую линию):\n'
+                + queryplans.report(fixed)
+            )
+        if regressions:
+            raise CommandError(
+                'Новые проблемы в планах запросов:\n'
+                + queryplans.report(regressions)
+            )
+        self.stdout.write('Регрессий в планах запросов нет.')
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import ChangeEvent
+
+
+class Command(BaseCommand):
+    help = (
+        'Сжимает журнал изменений: из событий старше --days для каждого '
+        'объекта остаётся только последнее.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = ChangeEvent.objects.filter(
+            created__lt=timezone.now() - timedelta(days=options['days'])
+        ).aggregate(last=Max('id'))['last']
+        if cutoff is None:
+            self.stdout.write('Сжимать нечего')
+            return
+        old = ChangeEvent.objects.filter(id__lte=cutoff)
+        latest = old.values('model', 'object_id').annotate(
+            last=Max('id')
+        ).values('last')
+        superseded = old.exclude(id__in=latest)
+        total = 0
+        while True:
+            ids = list(
+                superseded.values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                ChangeEvent.objects.filter(id__in=ids).delete()
+            total += len(ids)
+        self.stdout.write(f'Удалено событий: {total}')
@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils.module_loading import autodiscover_modules
+
+from core.tasks import run_next
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает воркеры фоновых задач: для каждой очереди столько '
+        'потоков, сколько указано в TASK_QUEUES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help='Обрабатывать только эту очередь (можно повторять).'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, если очередь пуста.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить все готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        queues = {
+            name: concurrency
+            for name, concurrency in settings.TASK_QUEUES.items()
+            if not options['queues'] or name in options['queues']
+        }
+        self.stop = threading.Event()
+        self.once = options['once']
+        self.poll_interval = options['poll_interval']
+        workers = sum(queues.values())
+        self.stdout.write(f'Очереди: {queues}, потоков: {workers}')
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.work, queue)
+                for queue, concurrency in queues.items()
+                for _ in range(concurrency)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                self.stop.set()
+
+    def work(self, queue):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                if run_next(queue):
+                    continue
+                if self.once:
+                    return
+                time.sleep(self.poll_interval)
+        finally:
+            connection.close()
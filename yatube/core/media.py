@@ -0,0 +1,156 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve(path):
+    """Путь к файлу в MEDIA_ROOT или Http404.
+
+    Отдаются только файлы из каталогов MEDIA_SERVE_PREFIXES: картинки
+    постов и миниатюры sorl-thumbnail.
+    """
+    if not path.startswith(tuple(settings.MEDIA_SERVE_PREFIXES)):
+        raise Http404
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    return fullpath
+
+
+def etag_for(stat):
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def parse_range(header, size):
+    """Разбирает заголовок Range в пару (start, end) включительно.
+
+    Возвращает None, если заголовок не поддерживается (несколько
+    диапазонов, другие единицы) — тогда отдаётся весь файл, и False,
+    если диапазон лежит за пределами файла.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    """If-Range: диапазон отдаётся, только если файл не изменился."""
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == int(mtime)
+
+
+def read_range(fullpath, start, length):
+    with open(fullpath, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def offload(fullpath, path):
+    """Передаёт отдачу файла фронт-серверу.
+
+    MEDIA_SENDFILE = 'x-sendfile' — Apache/lighttpd, 'x-accel' — nginx
+    (внутренний location MEDIA_ACCEL_PREFIX). Диапазоны и условные
+    запросы фронт-сервер обрабатывает сам.
+    """
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == 'x-accel':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + path
+    else:
+        response['X-Sendfile'] = fullpath
+    return response
+
+
+def partial(request, fullpath, size):
+    """Ответ 206 или 416, либо None, если нужно отдать весь файл."""
+    byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range is None:
+        return None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = 'bytes */%d' % size
+        return response
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        read_range(fullpath, start, length), status=206
+    )
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+    return response
+
+
+@require_safe
+def serve(request, path):
+    """Отдаёт медиафайл без чтения его целиком в память воркера.
+
+    Поддерживает ETag/Last-Modified (304), Range (206) и долгое
+    кеширование. Полный файл уходит через FileResponse, то есть через
+    wsgi.file_wrapper сервера, а при MEDIA_SENDFILE — фронт-серверу.
+    """
+    path = posixpath.normpath(path)
+    fullpath = resolve(path)
+    stat = os.stat(fullpath)
+    etag = etag_for(stat)
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if conditional is not None:
+        response = conditional
+    elif settings.MEDIA_SENDFILE:
+        response = offload(fullpath, path)
+    else:
+        response = None
+        if ('HTTP_RANGE' in request.META
+                and if_range_matches(request, etag, stat.st_mtime)):
+            response = partial(request, fullpath, stat.st_size)
+        if response is None:
+            response = FileResponse(open(fullpath, 'rb'))
+            response['Content-Length'] = str(stat.st_size)
+        response['Accept-Ranges'] = 'bytes'
+    if response.status_code in (200, 206):
+        content_type, encoding = mimetypes.guess_type(fullpath)
+        response['Content-Type'] = (
+            content_type or 'application/octet-stream'
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = 'public, max-age=%d, immutable' % (
+        settings.MEDIA_CACHE_MAX_AGE
+    )
+    return response
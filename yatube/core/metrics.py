@@ -0,0 +1,288 @@
+"""Метрики в текстовом формате Prometheus, общие для всех воркеров.
+
+Каждый процесс считает в словаре в памяти: запись — это сложение под
+блокировкой. Раз в METRICS_FLUSH_INTERVAL секунд процесс сохраняет свои
+значения в METRICS_DIR/<pid>-<метка запуска>.json, а страница /metrics/
+складывает файлы всех процессов. Гистограммы хранятся сразу
+накопительными корзинами, поэтому любые значения складываются простым
+суммированием.
+
+Файлы завершившихся процессов при сборе прибавляются к archive.json и
+удаляются, как в multiprocess-режиме клиента Prometheus: счётчики не
+уменьшаются, а процесс с тем же pid начинает свой файл.
+
+Каталог METRICS_DIR нужно очищать при перезапуске сервера, иначе
+счётчики прошлых запусков продолжат учитываться.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.files import locks
+
+# Имя -> (тип, описание).
+METRICS = {
+    'yatube_requests_total': (
+        'counter', 'HTTP-запросы по view, методу и коду ответа.'
+    ),
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время обработки запроса по view.'
+    ),
+    'yatube_request_queries': (
+        'histogram', 'Число SQL-запросов на HTTP-запрос по view.'
+    ),
+    'yatube_cache_requests_total': (
+        'counter', 'Чтения из кеша по ключу и результату (hit/miss).'
+    ),
+    'yatube_thumbnails_total': (
+        'counter', 'Построенные миниатюры по результату.'
+    ),
+}
+
+ARCHIVE = 'archive.json'
+LOCK = '.lock'
+
+lock = threading.Lock()
+values = defaultdict(float)
+state = {}
+
+
+def reset():
+    with lock:
+        values.clear()
+        state['flushed'] = time.monotonic()
+        state['name'] = f'{os.getpid()}-{uuid.uuid4().hex[:8]}.json'
+
+
+reset()
+
+
+# Дочерний процесс не должен второй раз отдать значения родителя.
+os.register_at_fork(after_in_child=reset)
+
+
+def labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    key = (name, labels_key(labels))
+    with lock:
+        values[key] += amount
+
+
+def observe(name, value, buckets, **labels):
+    labels = labels_key(labels)
+    with lock:
+        for bound in buckets:
+            if value <= bound:
+                values[name + '_bucket', labels + (('le', str(bound)),)] += 1
+        values[name + '_bucket', labels + (('le', '+Inf'),)] += 1
+        values[name + '_sum', labels] += value
+        values[name + '_count', labels] += 1
+
+
+def path_for(name):
+    return os.path.join(settings.METRICS_DIR, name)
+
+
+def write_rows(path, rows):
+    # Замена файла целиком: читатель не увидит его наполовину записанным.
+    fd, temporary = tempfile.mkstemp(dir=settings.METRICS_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(rows, file)
+    os.replace(temporary, path)
+
+
+def read_rows(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return []
+
+
+def as_rows(total):
+    return [
+        [name, list(labels), value] for (name, labels), value in total.items()
+    ]
+
+
+def add_rows(total, rows):
+    for name, labels, value in rows:
+        total[name, tuple(map(tuple, labels))] += value
+    return total
+
+
+def flush(force=False):
+    """Сохраняет значения процесса в его файл, если пора."""
+    with lock:
+        due = time.monotonic() - state['flushed']
+        if not force and due < settings.METRICS_FLUSH_INTERVAL:
+            return
+        rows = as_rows(values)
+        state['flushed'] = time.monotonic()
+        name = state['name']
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    write_rows(path_for(name), rows)
+
+
+def is_dead(name):
+    """Завершился ли процесс, записавший файл name."""
+    pid = name.split('-', 1)[0]
+    if not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        # Тот же pid у прошлого процесса: его файл уже ничей.
+        return name != state['name']
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def archive_dead(names):
+    """Прибавляет файлы завершившихся процессов к архиву и удаляет их.
+
+    Возвращает имена оставшихся файлов.
+    """
+    dead = [name for name in names if is_dead(name)]
+    if not dead:
+        return names
+    total = add_rows(defaultdict(float), read_rows(path_for(ARCHIVE)))
+    for name in dead:
+        add_rows(total, read_rows(path_for(name)))
+    write_rows(path_for(ARCHIVE), as_rows(total))
+    for name in dead:
+        os.remove(path_for(name))
+    return [name for name in names if name not in dead]
+
+
+def collect():
+    """Сумма значений всех процессов: {(имя, метки): значение}.
+
+    Архивирование и чтение идут под файловой блокировкой, чтобы
+    параллельный сбор не учёл файл дважды.
+    """
+    flush(force=True)
+    with open(path_for(LOCK), 'a') as lock_file:
+        locks.lock(lock_file, locks.LOCK_EX)
+        try:
+            names = [
+                entry.name for entry in os.scandir(settings.METRICS_DIR)
+                if entry.name.endswith('.json') and entry.name != ARCHIVE
+            ]
+            total = defaultdict(float)
+            for name in [ARCHIVE] + archive_dead(names):
+                add_rows(total, read_rows(path_for(name)))
+        finally:
+            locks.unlock(lock_file)
+    return total
+
+
+def base_name(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return name
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def format_value(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def render(total):
+    """Текстовый формат Prometheus (version 0.0.4)."""
+    lines = []
+    grouped = defaultdict(list)
+    for (name, labels), value in total.items():
+        grouped[base_name(name)].append((name, labels, value))
+    for metric in sorted(grouped):
+        kind, help_text = METRICS.get(metric, ('untyped', ''))
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for name, labels, value in sorted(grouped[metric], key=sort_key):
+            text = ','.join(f'{k}="{escape(v)}"' for k, v in labels)
+            lines.append(
+                f'{name}{{{text}}} {format_value(value)}' if text
+                else f'{name} {format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def sort_key(row):
+    """Корзины гистограммы — по возрастанию границы, +Inf последней."""
+    name, labels, _ = row
+    other = tuple(pair for pair in labels if pair[0] != 'le')
+    bound = dict(labels).get('le')
+    return (
+        other,
+        name,
+        float(bound) if bound is not None else 0.0,
+    )
+
+
+def request_finished(request, response, seconds, queries):
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else 'unresolved'
+    inc(
+        'yatube_requests_total',
+        view=view,
+        method=request.method,
+        status=str(response.status_code)
+    )
+    observe(
+        'yatube_request_duration_seconds',
+        seconds,
+        settings.METRICS_LATENCY_BUCKETS,
+        view=view
+    )
+    observe(
+        'yatube_request_queries',
+        queries,
+        settings.METRICS_QUERY_BUCKETS,
+        view=view
+    )
+    flush()
+
+
+FRAGMENT_PREFIX = 'template.cache.'
+SESSION_PREFIX = 'django.contrib.sessions.'
+KEY_END = re.compile(r'[:.|]|_?\d')
+
+
+def key_name(key):
+    """Ключ кеша без идентификаторов: 'auth_user_5' -> 'auth_user'.
+
+    Значение идёт в метку, поэтому число разных имён должно быть
+    небольшим.
+    """
+    if key.startswith(FRAGMENT_PREFIX):
+        return 'fragment:' + key[len(FRAGMENT_PREFIX):].split('.')[0]
+    if key.startswith(SESSION_PREFIX):
+        return 'session'
+    return KEY_END.split(key, 1)[0] or 'other'
+
+
+def cache_read(key, hit):
+    inc(
+        'yatube_cache_requests_total',
+        key=key_name(key),
+        result='hit' if hit else 'miss'
+    )
@@ -0,0 +1,120 @@
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics, slowlog
+
+USER_CACHE_KEY = 'auth_user_{}'
+
+
+def user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def load_user(request):
+    """Возвращает пользователя сессии, по возможности из кеша.
+
+    Пользователь кешируется по id в общем для воркеров кеше: все сессии
+    одного пользователя разделяют одну запись, и её сброс при изменении
+    пароля или выходе виден сразу всем процессам. Хеш пароля из сессии
+    и is_active проверяются на каждом запросе, как в
+    django.contrib.auth.get_user.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    cache = caches['shared']
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    backend = auth.load_backend(backend_path)
+    if not getattr(backend, 'user_can_authenticate', bool)(user):
+        request.session.flush()
+        return AnonymousUser()
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    )):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+def get_cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = load_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """Замена AuthenticationMiddleware без запроса к auth_user."""
+
+    def process_request(self, request):
+        assert hasattr(request, 'session'), (
+            'CachedAuthenticationMiddleware requires SessionMiddleware '
+            'to be installed before it.'
+        )
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class SlowLogMiddleware:
+    """Засекает время запроса и каждого SQL-запроса в нём.
+
+    Стоит первым в MIDDLEWARE, чтобы учитывать и запросы сессий и
+    аутентификации. См. core.slowlog.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = slowlog.QueryTimer(request)
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        slowlog.request_finished(
+            request, response, (time.perf_counter() - start) * 1000, timer
+        )
+        return response
+
+
+class MetricsMiddleware:
+    """Число запросов, время ответа и число SQL-запросов по view.
+
+    См. core.metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(None)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+        metrics.request_finished(
+            request, response, time.perf_counter() - start, len(queries)
+        )
+        return response
@@ -0,0 +1,198 @@
+"""Проверка планов запросов всех страниц приложения posts.
+
+Каждый маршрут posts/urls.py запрашивается на одинаковых засеянных
+данных, все выполненные SELECT/UPDATE/DELETE прогоняются через
+EXPLAIN QUERY PLAN, а найденные проблемы сравниваются с базовой линией
+в settings.QUERY_PLAN_BASELINE. Новая проблема — регрессия.
+"""
+import json
+import re
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import sitemaps
+from posts.models import Comment, Follow, Group, Post
+from posts.urls import urlpatterns
+
+from .slowlog import fingerprint
+
+User = get_user_model()
+
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE')
+
+# Признак в строке плана -> вид проблемы. SQLite до 3.36 пишет
+# «SCAN TABLE x» и «SEARCH TABLE x» вместо «SCAN x» и «SEARCH x».
+ISSUES = (
+    (re.compile(r'^SCAN (?:TABLE )?(\S+)$'), 'full_scan'),
+    (re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)'),
+     'temp_btree'),
+    (re.compile(r'^SEARCH (?:TABLE )?(\S+) USING AUTOMATIC '),
+     'automatic_index'),
+    (re.compile(r'^SEARCH (?:TABLE )?(\S+) USING INDEX'), 'not_covering'),
+)
+
+
+def seed():
+    """Небольшой одинаковый набор данных; возвращает аргументы URL."""
+    author = User.objects.create_user(username='plan-author')
+    reader = User.objects.create_user(username='plan-reader')
+    group = Group.objects.create(
+        title='plan-group', slug='plan-group', description='plan'
+    )
+    now = timezone.now()
+    for i in range(30):
+        post = Post.objects.create(
+            text=f'plan-text{i}',
+            author=author,
+            group=group if i % 2 else None
+        )
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=now - timedelta(hours=i)
+        )
+        root = Comment.objects.create(text='root', author=reader, post=post)
+        Comment.objects.create(
+            text='reply', author=author, post=post, parent=root
+        )
+    Follow.objects.create(user=reader, author=author)
+    return reader, {
+        'slug': group.slug,
+        'username': author.username,
+        'post_id': post.pk,
+        'year': now.year,
+        'month': now.month,
+        'name': 'posts-0.xml.gz',
+    }
+
+
+def problems(plan):
+    """Проблемы в строках EXPLAIN QUERY PLAN: [(вид, таблица)]."""
+    found = []
+    for detail in plan:
+        for pattern, issue in ISSUES:
+            match = pattern.search(detail)
+            if match:
+                table = match.group(1) if issue != 'temp_btree' else (
+                    match.group(1).lower().replace(' ', '_')
+                )
+                found.append((issue, table))
+                break
+    return found
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def capture(client, url):
+    """Запросы, выполненные при GET url: [(sql, params)]."""
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(EXPLAINED):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        client.get(url)
+    return statements
+
+
+def findings_for(statements):
+    result = {}
+    for sql, params in statements:
+        text, digest = fingerprint(sql)
+        for issue, table in problems(explain(sql, params)):
+            result[f'{issue} {table} {digest}'] = text
+    return result
+
+
+# Свои кеши в памяти: общий кеш рабочего сервера не трогаем.
+CACHES = {
+    alias: {
+        'BACKEND': 'core.cache.LocMemCache',
+        'LOCATION': f'queryplans-{alias}',
+    }
+    for alias in ('default', 'shared')
+}
+
+
+def collect():
+    """Проблемы планов по маршрутам: {маршрут: {ключ: текст запроса}}.
+
+    Нужна пустая тестовая база: данные засеиваются здесь же, sitemap
+    строится заранее, как это делает команда. Кеши очищаются перед
+    каждым маршрутом, чтобы увидеть все запросы.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        with override_settings(SITEMAP_ROOT=directory, CACHES=CACHES):
+            reader, arguments = seed()
+            sitemaps.build()
+            client = Client()
+            client.force_login(reader)
+            findings = {}
+            for pattern in urlpatterns:
+                names = pattern.pattern.converters
+                kwargs = {name: arguments[name] for name in names}
+                for alias in CACHES:
+                    caches[alias].clear()
+                url = reverse(f'posts:{pattern.name}', kwargs=kwargs)
+                findings[pattern.name] = findings_for(capture(client, url))
+    return findings
+
+
+def load_baseline(path=None):
+    try:
+        with open(path or settings.QUERY_PLAN_BASELINE) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(findings, path=None):
+    with open(path or settings.QUERY_PLAN_BASELINE, 'w') as file:
+        json.dump(findings, file, ensure_ascii=False, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def compare(findings, baseline):
+    """Новые и исчезнувшие проблемы: ([(маршрут, ключ, sql)], [...])."""
+    regressions, fixed = [], []
+    for route in sorted(set(findings) | set(baseline)):
+        current, known = findings.get(route, {}), baseline.get(route, {})
+        regressions += [
+            (route, key, current[key]) for key in sorted(current)
+            if key not in known
+        ]
+        fixed += [
+            (route, key, known[key]) for key in sorted(known)
+            if key not in current
+        ]
+    return regressions, fixed
+
+
+def report(rows):
+    return '\n'.join(f'{route}: {key}\n    {sql}' for route, key, sql in rows)
+
+
+def assert_no_regressions():
+    """Помощник для тестов: падает, если появились новые проблемы.
+
+    Вызывается внутри теста с тестовой базой (TestCase или pytest с
+    настроенной базой Django).
+    """
+    regressions, _ = compare(collect(), load_baseline())
+    assert not regressions, (
+        'Новые проблемы в планах запросов (если они ожидаемы, обновите '
+        'базовую линию: manage.py check_query_plans --update):\n'
+        + report(regressions)
+    )
@@ -0,0 +1,96 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import render
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'20/m' -> (20, 60): сколько запросов разрешено за период."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def client_ip(request):
+    """Адрес клиента с учётом доверенных прокси перед приложением.
+
+    X-Forwarded-For читается справа налево: адреса доверенных прокси
+    пропускаются, первый чужой адрес — клиент. Заголовку от клиента,
+    пришедшего не через доверенный прокси, не верим.
+    """
+    trusted = settings.RATELIMIT_TRUSTED_PROXIES
+    address = request.META.get('REMOTE_ADDR', '')
+    if address not in trusted:
+        return address
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    for hop in reversed([part.strip() for part in forwarded.split(',')]):
+        if hop and hop not in trusted:
+            return hop
+    return address
+
+
+def refill(state, count, period, now):
+    """Жетоны корзины на момент now; нет состояния — корзина полна."""
+    tokens, stamp = state or (count, now)
+    return min(count, tokens + (now - stamp) * count / period)
+
+
+def take(buckets):
+    """Берёт по жетону из всех корзин или ни из одной.
+
+    Корзина — (жетоны, время) в общем кеше: вмещает count жетонов и
+    пополняется со скоростью count за period, поэтому на стыке периодов
+    не пропускает двойной лимит. Чтение, проверка всех корзин и запись
+    идут под одной блокировкой кеша, так что подсчёт атомарен во всех
+    воркерах, а отказ не тратит жетоны других корзин.
+    Возвращает 0, если запрос разрешён, иначе — сколько секунд ждать.
+    """
+    buckets = list(buckets)
+    cache = caches['shared']
+    now = time.time()
+    with cache.locked():
+        states = cache.get_many([key for key, _ in buckets])
+        wait, updates = 0, {}
+        for key, rate in buckets:
+            count, period = parse_rate(rate)
+            tokens = refill(states.get(key), count, period, now)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) * period / count)
+            updates[key] = ((tokens - 1, now), period)
+        if not wait:
+            for key, (state, period) in updates.items():
+                # За period пустая корзина наполняется: ключ не нужен.
+                cache.set(key, state, period)
+    return wait
+
+
+def ratelimit(scope, methods=None):
+    """Ограничивает частоту запросов к view по пользователю и по IP.
+
+    Лимиты берутся из settings.RATELIMIT_RATES[scope]; при превышении
+    возвращается 429 с заголовком Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if methods and request.method not in methods:
+                return view(request, *args, **kwargs)
+            rates = settings.RATELIMIT_RATES[scope]
+            buckets = [(f'ip:{client_ip(request)}', rates['ip'])]
+            if request.user.is_authenticated:
+                buckets.append((f'user:{request.user.pk}', rates['user']))
+            wait = take(
+                (f'ratelimit:{scope}:{bucket}', rate)
+                for bucket, rate in buckets
+            )
+            if wait:
+                response = render(request, 'core/429.html', status=429)
+                response['Retry-After'] = math.ceil(wait)
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,198 @@
+"""Журнал медленных SQL-запросов и медленных HTTP-запросов.
+
+Каждое событие — строка JSON в файле процесса с ротацией по размеру:
+SLOWLOG_PATH с pid перед расширением, например slow.1234.jsonl. Общий
+файл ротировали бы сразу несколько процессов и теряли бы строки друг
+друга. Отдельные события пишутся с вероятностью SLOWLOG_SAMPLE_RATE, а сводка
+по каждому отпечатку запроса (число, суммарное и максимальное время)
+учитывается всегда и сбрасывается в файл раз в SLOWLOG_FLUSH_INTERVAL
+секунд.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bIN \(\?(?:\s*,\s*\?)*\)', re.I), 'IN (...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+# Кадры стека из этих модулей неинтересны: они есть в каждом запросе.
+SKIPPED_FRAMES = (os.sep + 'django' + os.sep, 'site-packages', __file__)
+
+lock = threading.Lock()
+aggregates = {}
+state = {'flushed': time.monotonic()}
+loggers = {}
+
+
+def fingerprint(sql):
+    """Текст запроса без значений и его короткий хеш.
+
+    Параметры в текст не попадают, литералы заменяются на «?», списки
+    IN (...) любой длины выглядят одинаково.
+    """
+    text = sql.strip()
+    for pattern, replacement in NORMALIZE:
+        text = pattern.sub(replacement, text)
+    return text, hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def stack_excerpt():
+    """Последние кадры стека из кода проекта: «файл:строка функция»."""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if not any(part in frame.filename for part in SKIPPED_FRAMES)
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, settings.BASE_DIR)}:'
+        f'{frame.lineno} {frame.name}'
+        for frame in frames[-settings.SLOWLOG_STACK_DEPTH:]
+    ]
+
+
+def log_path(pid=None):
+    """Файл журнала процесса pid (по умолчанию — текущего)."""
+    root, extension = os.path.splitext(settings.SLOWLOG_PATH)
+    return f'{root}.{pid or os.getpid()}{extension}'
+
+
+def get_logger():
+    # pid в пути: после fork дочерний процесс заведёт свой обработчик.
+    path = log_path()
+    logger = loggers.get(path)
+    if logger is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOWLOG_MAX_BYTES,
+            backupCount=settings.SLOWLOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+        logger = logging.getLogger(f'{__name__}.{len(loggers)}')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        loggers[path] = logger
+    return logger
+
+
+def write(event):
+    event['at'] = time.time()
+    get_logger().info(
+        json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)
+    )
+
+
+def sampled():
+    return random.random() < settings.SLOWLOG_SAMPLE_RATE
+
+
+def aggregate(kind, key, ms, view, **fields):
+    with lock:
+        entry = aggregates.setdefault((kind, key), dict(
+            fields, count=0, total_ms=0.0, max_ms=0.0, views=set()
+        ))
+        entry['count'] += 1
+        entry['total_ms'] += ms
+        entry['max_ms'] = max(entry['max_ms'], ms)
+        entry['views'].add(view or '')
+
+
+def flush(force=False):
+    """Пишет накопленную сводку, если пора; возвращает число строк."""
+    with lock:
+        due = time.monotonic() - state['flushed']
+        if not aggregates or not (
+            force or due >= settings.SLOWLOG_FLUSH_INTERVAL
+        ):
+            return 0
+        entries = list(aggregates.items())
+        aggregates.clear()
+        state['flushed'] = time.monotonic()
+    for (kind, key), entry in entries:
+        write(dict(
+            entry,
+            type='aggregate',
+            kind=kind,
+            key=key,
+            total_ms=round(entry['total_ms'], 3),
+            max_ms=round(entry['max_ms'], 3),
+            views=sorted(entry['views'])
+        ))
+    return len(entries)
+
+
+atexit.register(lambda: flush(force=True))
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+class QueryTimer:
+    """Обёртка курсора (connection.execute_wrapper) на один HTTP-запрос."""
+
+    def __init__(self, request):
+        self.request = request
+        self.count = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += ms
+            if ms >= settings.SLOWLOG_QUERY_MS:
+                slow_query(sql, ms, view_name(self.request))
+
+
+def slow_query(sql, ms, view):
+    text, digest = fingerprint(sql)
+    aggregate('query', digest, ms, view, sql=text)
+    if sampled():
+        write({
+            'type': 'query',
+            'view': view,
+            'fingerprint': digest,
+            'sql': text,
+            'ms': round(ms, 3),
+            'stack': stack_excerpt(),
+        })
+
+
+def request_finished(request, response, ms, timer):
+    if ms >= settings.SLOWLOG_REQUEST_MS:
+        view = view_name(request)
+        aggregate('request', view or request.path, ms, view)
+        if sampled():
+            write({
+                'type': 'request',
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'ms': round(ms, 3),
+                'queries': timer.count,
+                'sql_ms': round(timer.total_ms, 3),
+            })
+    flush()
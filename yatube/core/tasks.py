@@ -0,0 +1,190 @@
+import json
+import logging
+import random
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(name=None, queue='default', max_attempts=5, atomic=False):
+    """Регистрирует функцию как фоновую задачу.
+
+    У функции появляется метод delay(), который ставит вызов в очередь
+    вместо немедленного выполнения. Транзакциями задача управляет сама;
+    atomic=True выполняет её целиком в одной транзакции.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = func
+
+        def delay(*args, idempotency_key=None, countdown=0, **kwargs):
+            return enqueue(
+                task_name,
+                args=args,
+                kwargs=kwargs,
+                queue=queue,
+                max_attempts=max_attempts,
+                idempotency_key=idempotency_key,
+                countdown=countdown
+            )
+
+        func.task_name = task_name
+        func.atomic = atomic
+        func.delay = delay
+        return func
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, queue='default', max_attempts=5,
+            idempotency_key=None, countdown=0):
+    """Ставит задачу в очередь.
+
+    Повторная постановка с тем же idempotency_key возвращает уже
+    существующую задачу.
+    """
+    fields = {
+        'name': name,
+        'queue': queue,
+        'payload': json.dumps({'args': list(args), 'kwargs': kwargs or {}}),
+        'max_attempts': max_attempts,
+        'run_at': timezone.now() + timedelta(seconds=countdown),
+    }
+    if idempotency_key is None:
+        return Task.objects.create(**fields)
+    task_obj, _ = Task.objects.get_or_create(
+        idempotency_key=idempotency_key,
+        defaults=fields
+    )
+    return task_obj
+
+
+def claimable(queue, now):
+    """Задачи, готовые к запуску, и задачи, у которых истёк таймаут.
+
+    Задача с истёкшим таймаутом, исчерпавшая попытки, сюда не попадает:
+    её помечает неудачной abandon().
+    """
+    return Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(
+            status=Task.RUNNING,
+            locked_until__lt=now,
+            attempts__lt=F('max_attempts')
+        ),
+        queue=queue
+    )
+
+
+def abandon(queue, now):
+    """Помечает неудачными задачи, которые каждый раз роняют воркер.
+
+    Такая задача не доходит до fail(): воркер умирает, таймаут истекает,
+    и без этой проверки её перезапускали бы бесконечно.
+    """
+    return Task.objects.filter(
+        queue=queue,
+        status=Task.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=F('max_attempts')
+    ).update(
+        status=Task.FAILED,
+        locked_until=None,
+        last_error='Истёк таймаут выполнения после последней попытки'
+    )
+
+
+def claim(queue):
+    """Захватывает одну задачу очереди.
+
+    Захват — условный UPDATE, поэтому одну задачу не заберут два
+    воркера, даже если они работают в разных процессах.
+    """
+    now = timezone.now()
+    timeout = timedelta(seconds=settings.TASK_VISIBILITY_TIMEOUT)
+    abandon(queue, now)
+    candidates = claimable(queue, now).order_by('run_at').values_list(
+        'pk', flat=True
+    )[:10]
+    for pk in candidates:
+        won = claimable(queue, now).filter(pk=pk).update(
+            status=Task.RUNNING,
+            locked_until=now + timeout,
+            attempts=F('attempts') + 1
+        )
+        if won:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def owned(task_obj):
+    """Задача, пока её захват принадлежит этому воркеру.
+
+    Если таймаут истёк и задачу забрал другой воркер, у неё уже другие
+    locked_until и attempts, и запоздавший результат не запишется.
+    """
+    return Task.objects.filter(
+        pk=task_obj.pk,
+        status=Task.RUNNING,
+        locked_until=task_obj.locked_until,
+        attempts=task_obj.attempts
+    )
+
+
+def backoff(attempts):
+    base = settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return base + random.uniform(0, base)
+
+
+def execute(task_obj):
+    func = registry.get(task_obj.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {task_obj.name} не зарегистрирована')
+        payload = json.loads(task_obj.payload)
+        with transaction.atomic() if func.atomic else nullcontext():
+            func(*payload['args'], **payload['kwargs'])
+    except Exception as error:
+        logger.exception('Задача %s завершилась ошибкой', task_obj.pk)
+        fail(task_obj, error)
+        return
+    if not owned(task_obj).update(
+        status=Task.DONE,
+        locked_until=None,
+        last_error=''
+    ):
+        logger.warning('Задачу %s уже забрал другой воркер', task_obj.pk)
+
+
+def fail(task_obj, error):
+    if task_obj.attempts >= task_obj.max_attempts:
+        status, run_at = Task.FAILED, task_obj.run_at
+    else:
+        status = Task.PENDING
+        run_at = timezone.now() + timedelta(
+            seconds=backoff(task_obj.attempts)
+        )
+    owned(task_obj).update(
+        status=status,
+        run_at=run_at,
+        locked_until=None,
+        last_error=repr(error)
+    )
+
+
+def run_next(queue):
+    """Выполняет одну задачу. Возвращает False, если очередь пуста."""
+    task_obj = claim(queue)
+    if task_obj is None:
+        return False
+    execute(task_obj)
+    return True
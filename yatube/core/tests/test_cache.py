@@ -0,0 +1,41 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from core.cache import FileCache
+
+
+class FileCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = FileCache(directory.name, {})
+
+    def test_incr_is_atomic_and_keeps_expiry(self):
+        self.cache.set('counter', 0, 60)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: self.cache.incr('counter'), range(200)))
+        self.assertEqual(self.cache.get('counter'), 200)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_add_only_once(self):
+        with ThreadPoolExecutor(8) as pool:
+            added = list(pool.map(
+                lambda i: self.cache.add('key', i, 60), range(50)
+            ))
+        self.assertEqual(added.count(True), 1)
+
+    def test_directory_is_listed_every_cull_every_writes(self):
+        cache = FileCache(self.cache._dir, {
+            'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_EVERY': 5},
+        })
+        listed = []
+        original = cache._list_cache_files
+        cache._list_cache_files = lambda: listed.append(1) or original()
+        for i in range(10):
+            cache.set(f'key{i}', i)
+            cache.add(f'other{i}', i)
+        self.assertEqual(len(listed), 4)
+        self.assertLess(len(original()), 20)
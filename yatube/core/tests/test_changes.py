@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import ChangeEvent
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(CHANGES_TOKEN='test-token')
+class ChangeLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test-author')
+        cls.reader = User.objects.create_user(username='test-reader')
+
+    def test_changes_are_logged_in_order(self):
+        """Каждое изменение попадает в журнал с растущим номером."""
+        start = ChangeEvent.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        post = Post.objects.create(text='test-text', author=self.author)
+        post.text = 'test-edited'
+        post.save()
+        Comment.objects.create(text='c', author=self.reader, post=post)
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.filter(pk=post.pk).delete()
+
+        data = self.client.get(
+            reverse('api:changes'), {'since': start},
+            HTTP_AUTHORIZATION='Bearer test-token'
+        ).json()
+        self.assertEqual(
+            [(event['model'], event['action']) for event in data['results']],
+            [
+                ('posts.post', 'create'),
+                ('posts.post', 'update'),
+                ('posts.comment', 'create'),
+                ('posts.follow', 'create'),
+                ('posts.comment', 'delete'),
+                ('posts.post', 'delete'),
+            ]
+        )
+        self.assertEqual(data['results'][1]['data']['text'], 'test-edited')
+        self.assertEqual(data['last'], data['results'][-1]['id'])
+        empty = self.client.get(
+            reverse('api:changes'), {'since': data['last']},
+            HTTP_AUTHORIZATION='Bearer test-token'
+        ).json()
+        self.assertEqual(empty['results'], [])
+
+    def test_changes_require_token_or_staff(self):
+        """Журнал с подписками не отдаётся анонимам и обычным юзерам."""
+        url = reverse('api:changes')
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}):
+            with self.subTest(headers=headers):
+                self.assertEqual(
+                    self.client.get(url, **headers).status_code, 403
+                )
+        with override_settings(CHANGES_TOKEN=''):
+            response = self.client.get(url, HTTP_AUTHORIZATION='Bearer ')
+            self.assertEqual(response.status_code, 403)
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(
+            User.objects.create_user(username='test-staff', is_staff=True)
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_compaction_keeps_latest_event_per_object(self):
+        post = Post.objects.create(text='test-text', author=self.author)
+        for i in range(3):
+            post.text = f'test-edit{i}'
+            post.save()
+        ChangeEvent.objects.update(created=timezone.now() - timedelta(days=60))
+        call_command('compact_changes', batch_size=1, stdout=StringIO())
+        events = ChangeEvent.objects.filter(model='posts.post')
+        self.assertEqual(events.count(), 1)
+        self.assertIn('test-edit2', events.get().data)
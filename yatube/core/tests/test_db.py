@@ -0,0 +1,41 @@
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+
+from core.db import atomic_retry
+
+
+class SqlitePragmasTests(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class AtomicRetryTests(TransactionTestCase):
+    def test_locked_transaction_is_retried(self):
+        """Транзакция, упавшая на блокировке, выполняется заново."""
+        calls = []
+
+        @atomic_retry(delay=0)
+        def write():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        self.assertEqual(write(), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        calls = []
+
+        @atomic_retry(delay=0)
+        def write():
+            calls.append(1)
+            raise OperationalError('no such table')
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.thumbnails import CountingBackend
+
+User = get_user_model()
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(
+            METRICS_DIR=self.directory, METRICS_TOKEN='test-token'
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def scrape(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer test-token'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode().splitlines()
+
+    def test_views_and_index_cache_are_counted(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        lines = self.scrape()
+        for line in (
+            'yatube_requests_total{method="GET",status="200",'
+            'view="posts:index"} 2',
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            'yatube_cache_requests_total{key="index_page",result="miss"} 1',
+            'yatube_cache_requests_total{key="index_page",result="hit"} 1',
+            '# TYPE yatube_request_queries histogram',
+        ):
+            with self.subTest(line=line):
+                self.assertIn(line, lines)
+        buckets = [
+            line for line in lines if line.startswith(
+                'yatube_request_duration_seconds_bucket{view="posts:index"'
+            )
+        ]
+        self.assertTrue(buckets[-1].startswith(
+            'yatube_request_duration_seconds_bucket{view="posts:index",'
+            'le="+Inf"} 2'
+        ))
+
+    def test_other_processes_are_added(self):
+        # pid 1 жив всегда, его файл не архивируется.
+        with open(os.path.join(self.directory, '1-a.json'), 'w') as file:
+            json.dump([['yatube_thumbnails_total', [['result', 'created']],
+                        3]], file)
+        metrics.inc('yatube_thumbnails_total', result='created')
+        self.assertIn(
+            'yatube_thumbnails_total{result="created"} 4', self.scrape()
+        )
+
+    def test_cache_key_names_drop_ids(self):
+        for key, name in (
+            ('auth_user_5', 'auth_user'),
+            ('following_12', 'following'),
+            ('ratelimit:follow:ip:127.0.0.1', 'ratelimit'),
+            ('template.cache.index_page.d41d8cd9', 'fragment:index_page'),
+            ('django.contrib.sessions.cached_dbabc123', 'session'),
+        ):
+            with self.subTest(key=key):
+                self.assertEqual(metrics.key_name(key), name)
+
+    def test_dead_processes_are_archived(self):
+        """Файл завершившегося процесса переходит в архив, сумма та же."""
+        child = subprocess.Popen([sys.executable, '-c', ''])
+        child.wait()
+        name = f'{child.pid}-a.json'
+        with open(os.path.join(self.directory, name), 'w') as file:
+            json.dump([['yatube_thumbnails_total', [['result', 'created']],
+                        2]], file)
+        for _ in range(2):
+            self.assertIn(
+                'yatube_thumbnails_total{result="created"} 2', self.scrape()
+            )
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory, name))
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(self.directory, metrics.ARCHIVE))
+        )
+
+    def test_reused_pid_does_not_reset_counters(self):
+        stale = f'{os.getpid()}-old.json'
+        with open(os.path.join(self.directory, stale), 'w') as file:
+            json.dump([['yatube_thumbnails_total', [['result', 'created']],
+                        5]], file)
+        metrics.inc('yatube_thumbnails_total', result='created')
+        self.assertIn(
+            'yatube_thumbnails_total{result="created"} 6', self.scrape()
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.directory, stale)))
+
+    def test_sorl_builds_are_counted(self):
+        with mock.patch(
+            'sorl.thumbnail.base.ThumbnailBackend._create_thumbnail'
+        ) as create:
+            CountingBackend()._create_thumbnail(None, '960x339', {}, None)
+            create.side_effect = OSError
+            with self.assertRaises(OSError):
+                CountingBackend()._create_thumbnail(None, '960x339', {}, None)
+        lines = self.scrape()
+        self.assertIn('yatube_thumbnails_total{result="created"} 1', lines)
+        self.assertIn('yatube_thumbnails_total{result="error"} 1', lines)
+
+    def test_requires_token_or_staff(self):
+        url = reverse('metrics')
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}):
+            with self.subTest(headers=headers):
+                self.assertEqual(
+                    self.client.get(url, **headers).status_code, 403
+                )
+        with override_settings(METRICS_TOKEN=''):
+            response = self.client.get(url, HTTP_AUTHORIZATION='Bearer ')
+            self.assertEqual(response.status_code, 403)
+        self.client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
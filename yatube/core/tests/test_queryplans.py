@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase, TestCase
+
+from core import queryplans
+
+
+class PlanAnalysisTests(SimpleTestCase):
+    def test_problems_in_plan(self):
+        plan = [
+            'SCAN posts_post',
+            'SCAN posts_post USING INDEX posts_post_pub_dat_idx',
+            'SEARCH auth_user USING INTEGER PRIMARY KEY (rowid=?)',
+            'SEARCH posts_group USING INDEX sqlite_autoindex (slug=?)',
+            'SEARCH posts_follow USING COVERING INDEX follow_idx (user_id=?)',
+            'USE TEMP B-TREE FOR ORDER BY',
+            'BLOOM FILTER ON c (post_id=?)',
+            'SEARCH c USING AUTOMATIC COVERING INDEX (post_id=?)',
+        ]
+        self.assertEqual(queryplans.problems(plan), [
+            ('full_scan', 'posts_post'),
+            ('not_covering', 'posts_group'),
+            ('temp_btree', 'order_by'),
+            ('automatic_index', 'c'),
+        ])
+
+    def test_problems_in_plan_before_sqlite_3_36(self):
+        """Старый формат: «SCAN TABLE x» и «SEARCH TABLE x»."""
+        plan = [
+            'SCAN TABLE posts_post',
+            'SCAN TABLE posts_post USING INDEX posts_post_pub_dat_idx',
+            'SEARCH TABLE auth_user USING INTEGER PRIMARY KEY (rowid=?)',
+            'SEARCH TABLE posts_group USING INDEX sqlite_autoindex (slug=?)',
+            'SEARCH TABLE posts_follow USING COVERING INDEX f (user_id=?)',
+            'USE TEMP B-TREE FOR GROUP BY',
+            'SEARCH TABLE c USING AUTOMATIC COVERING INDEX (post_id=?)',
+        ]
+        self.assertEqual(queryplans.problems(plan), [
+            ('full_scan', 'posts_post'),
+            ('not_covering', 'posts_group'),
+            ('temp_btree', 'group_by'),
+            ('automatic_index', 'c'),
+        ])
+
+    def test_compare_reports_only_new_problems(self):
+        baseline = {'index': {'full_scan posts_group 1': 'a'}}
+        findings = {'index': {'full_scan posts_post 2': 'b'}}
+        regressions, fixed = queryplans.compare(findings, baseline)
+        self.assertEqual(
+            regressions, [('index', 'full_scan posts_post 2', 'b')]
+        )
+        self.assertEqual(fixed, [('index', 'full_scan posts_group 1', 'a')])
+
+
+class QueryPlanRegressionTests(TestCase):
+    def test_views_match_baseline(self):
+        queryplans.assert_no_regressions()
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.ratelimit import take
+
+User = get_user_model()
+
+RATES = {
+    'post_create': {'user': '100/m', 'ip': '100/m'},
+    'add_comment': {'user': '100/m', 'ip': '100/m'},
+    'follow': {'user': '2/m', 'ip': '100/m'},
+    'availability': {'user': '100/m', 'ip': '2/m'},
+}
+
+
+@override_settings(RATELIMIT_RATES=RATES)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-user')
+        cls.author = User.objects.create_user(username='test-author')
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_writes_over_limit_get_429(self):
+        """Запросы сверх лимита получают 429 и Retry-After."""
+        url = reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.author.username}
+        )
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertIn(int(response['Retry-After']), range(1, 61))
+
+    def test_limit_is_per_user(self):
+        url = reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.author.username}
+        )
+        for _ in range(3):
+            self.client.get(url)
+        other = Client()
+        other.force_login(self.author)
+        response = other.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_denied_request_does_not_spend_other_buckets(self):
+        url = reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.author.username}
+        )
+        for _ in range(5):
+            self.client.get(url)
+        other = Client()
+        other.force_login(self.author)
+        # Пять запросов с одного IP, но три из них отклонены по лимиту
+        # пользователя и не должны были тратить лимит IP.
+        with override_settings(RATELIMIT_RATES={
+            **RATES, 'follow': {'user': '100/m', 'ip': '3/m'}
+        }):
+            response = other.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_ip_comes_from_trusted_proxy_header(self):
+        url = reverse('users:check_availability')
+        for address in ('203.0.113.1', '203.0.113.1', '203.0.113.2'):
+            response = Client().get(
+                url,
+                {'username': 'free-name'},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.9, {address}'
+            )
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = Client().get(
+            url,
+            {'username': 'free-name'},
+            HTTP_X_FORWARDED_FOR='203.0.113.1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+
+    def take_at(self, now, buckets):
+        with mock.patch('core.ratelimit.time.time', return_value=now):
+            return take(buckets)
+
+    def test_no_double_limit_across_period_boundary(self):
+        """Лимит 2/m не пропускает 4 запроса вокруг границы минуты."""
+        bucket = [('test:ip', '2/m')]
+        self.assertEqual(self.take_at(59, bucket), 0)
+        self.assertEqual(self.take_at(59, bucket), 0)
+        self.assertAlmostEqual(self.take_at(61, bucket), 28)
+        self.assertEqual(self.take_at(89, bucket), 0)
+
+    def test_denied_request_keeps_tokens_of_other_buckets(self):
+        self.assertEqual(self.take_at(0, [('test:user', '1/m')]), 0)
+        for _ in range(3):
+            self.assertTrue(self.take_at(
+                1, [('test:ip', '2/m'), ('test:user', '1/m')]
+            ))
+        self.assertEqual(self.take_at(1, [('test:ip', '2/m')]), 0)
+        self.assertEqual(self.take_at(1, [('test:ip', '2/m')]), 0)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='test-user', password='test-password'
+        )
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.client = Client()
+        self.client.login(username='test-user', password='test-password')
+
+    def test_user_is_served_from_cache(self):
+        """Повторный запрос не обращается к сессиям и пользователям."""
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_invalidates_cached_user(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('another-password')
+        user.save()
+        response = self.client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_deactivated_user_is_rejected_from_cache(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        # update() не вызывает сигналы: в кеше остаётся активный пользователь.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cached = caches['shared'].get(f'auth_user_{self.user.pk}')
+        cached.is_active = False
+        caches['shared'].set(f'auth_user_{self.user.pk}', cached)
+        response = self.client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+class PurgeSessionsTests(TestCase):
+    def test_purge_removes_only_expired_sessions(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(
+                session_key=f'expired-{i}',
+                session_data='',
+                expire_date=now - timedelta(days=1)
+            )
+        Session.objects.create(
+            session_key='alive',
+            session_data='',
+            expire_date=now + timedelta(days=1)
+        )
+        call_command('purge_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive']
+        )
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import slowlog
+
+User = get_user_model()
+
+
+class FingerprintTests(TestCase):
+    def test_values_do_not_reach_the_log(self):
+        text, digest = slowlog.fingerprint(
+            "SELECT * FROM t WHERE name = 'secret' AND id IN (%s, %s, %s)"
+            " LIMIT 10"
+        )
+        self.assertEqual(
+            text, 'SELECT * FROM t WHERE name = ? AND id IN (...) LIMIT ?'
+        )
+        self.assertEqual(
+            slowlog.fingerprint('SELECT * FROM t WHERE id IN (%s)')[1],
+            slowlog.fingerprint('SELECT * FROM t WHERE id IN (%s, %s)')[1]
+        )
+        self.assertEqual(len(digest), 12)
+
+
+class SlowLogMiddlewareTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.setting = os.path.join(directory.name, 'slow.jsonl')
+        self.path = os.path.join(
+            directory.name, f'slow.{os.getpid()}.jsonl'
+        )
+        self.addCleanup(slowlog.aggregates.clear)
+        self.addCleanup(self.close_loggers)
+
+    def close_loggers(self):
+        directory = os.path.dirname(self.path)
+        for path in list(slowlog.loggers):
+            if path.startswith(directory):
+                for handler in slowlog.loggers.pop(path).handlers:
+                    handler.close()
+
+    def events(self):
+        with open(self.path, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_slow_queries_and_requests_are_logged(self):
+        User.objects.create_user(username='secret-name')
+        with override_settings(
+            SLOWLOG_PATH=self.setting,
+            SLOWLOG_QUERY_MS=0,
+            SLOWLOG_REQUEST_MS=0,
+            SLOWLOG_SAMPLE_RATE=1,
+            SLOWLOG_FLUSH_INTERVAL=0
+        ):
+            self.client.get(
+                reverse('posts:profile', args=('secret-name',))
+            )
+        events = self.events()
+        kinds = {event['type'] for event in events}
+        self.assertEqual(kinds, {'query', 'request', 'aggregate'})
+        query = next(event for event in events if event['type'] == 'query')
+        self.assertEqual(query['view'], 'posts:profile')
+        self.assertTrue(query['stack'])
+        request = next(
+            event for event in events if event['type'] == 'request'
+        )
+        self.assertGreater(request['queries'], 0)
+        self.assertEqual(request['status'], 200)
+        self.assertNotIn('secret-name', json.dumps(
+            [event for event in events if event['type'] != 'request']
+        ))
+
+    def test_fast_requests_are_not_logged(self):
+        with override_settings(SLOWLOG_PATH=self.setting):
+            self.client.get(reverse('posts:index'))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_each_process_writes_its_own_file(self):
+        with override_settings(SLOWLOG_PATH=self.setting):
+            slowlog.write({'type': 'test'})
+            with mock.patch('core.slowlog.os.getpid', return_value=1):
+                slowlog.write({'type': 'test'})
+        self.assertEqual(len(self.events()), 1)
+        other = os.path.join(os.path.dirname(self.path), 'slow.1.jsonl')
+        self.assertTrue(os.path.exists(other))
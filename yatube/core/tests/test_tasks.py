@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import claim, enqueue, execute, run_next, task
+
+calls = []
+
+
+@task(name='test.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='test.broken', max_attempts=2)
+def broken():
+    raise ValueError('boom')
+
+
+@task(name='test.partial')
+def partial():
+    enqueue('test.record', args=['written'])
+    raise ValueError('after write')
+
+
+@task(name='test.atomic_partial', atomic=True)
+def atomic_partial():
+    partial()
+
+
+@override_settings(TASK_RETRY_BACKOFF=60)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """Задача из очереди выполняется воркером ровно один раз."""
+        record.delay(42)
+        self.assertEqual(calls, [])
+        self.assertTrue(run_next('default'))
+        self.assertFalse(run_next('default'))
+        self.assertEqual(calls, [42])
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_idempotency_key(self):
+        first = record.delay(1, idempotency_key='once')
+        second = record.delay(2, idempotency_key='once')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_retry_with_backoff_then_fail(self):
+        broken.delay()
+        run_next('default')
+        task_obj = Task.objects.get()
+        self.assertEqual(task_obj.status, Task.PENDING)
+        self.assertGreater(task_obj.run_at, timezone.now())
+        self.assertIn('boom', task_obj.last_error)
+        self.assertFalse(run_next('default'))
+
+        Task.objects.update(run_at=timezone.now())
+        run_next('default')
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_transaction_is_opt_in(self):
+        """Без atomic=True сделанное до ошибки остаётся в базе."""
+        for func, kept in ((partial, 1), (atomic_partial, 0)):
+            with self.subTest(task=func.task_name):
+                Task.objects.all().delete()
+                task_obj = enqueue(func.task_name)
+                execute(claim('default'))
+                self.assertEqual(
+                    Task.objects.exclude(pk=task_obj.pk).count(), kept
+                )
+
+    def test_expired_lock_is_reclaimed(self):
+        task_obj = enqueue('test.record', args=[7])
+        Task.objects.filter(pk=task_obj.pk).update(
+            status=Task.RUNNING,
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertTrue(run_next('default'))
+        self.assertEqual(calls, [7])
+
+    def test_task_crashing_the_worker_fails_after_max_attempts(self):
+        task_obj = enqueue('test.record', args=[7], max_attempts=2)
+        Task.objects.filter(pk=task_obj.pk).update(
+            status=Task.RUNNING,
+            attempts=2,
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertFalse(run_next('default'))
+        self.assertEqual(calls, [])
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_late_worker_does_not_overwrite_new_claim(self):
+        enqueue('test.record', args=[7])
+        late = claim('default')
+        Task.objects.filter(pk=late.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        current = claim('default')
+        execute(late)
+        task_obj = Task.objects.get()
+        self.assertEqual(task_obj.status, Task.RUNNING)
+        self.assertEqual(task_obj.attempts, current.attempts)
+
+    def test_queues_are_separate(self):
+        enqueue('test.record', args=[1], queue='mail')
+        self.assertFalse(run_next('default'))
+        self.assertTrue(run_next('mail'))
@@ -0,0 +1,37 @@
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.test import TestCase
+
+from core import warmup
+
+
+class WarmupTests(TestCase):
+    def test_every_step_is_timed(self):
+        out = StringIO()
+        timings = warmup.run(imported=0.5, stream=out)
+        self.assertEqual(
+            [name for name, _, _ in timings],
+            ['import'] + [name for name, _ in warmup.STEPS]
+        )
+        self.assertIn('import 500 мс', out.getvalue())
+
+    def test_all_templates_compile(self):
+        count = sum(
+            name.endswith('.html')
+            for _, _, files in os.walk(settings.TEMPLATES_DIR)
+            for name in files
+        )
+        self.assertEqual(warmup.templates(), count)
+
+    def test_failed_step_does_not_stop_startup(self):
+        def broken():
+            raise RuntimeError('no database')
+
+        timings = warmup.run(
+            steps=(('broken', broken), ('urls', warmup.urls)),
+            stream=StringIO()
+        )
+        self.assertIn('no database', timings[0][2])
+        self.assertEqual(timings[1][0], 'urls')
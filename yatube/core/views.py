@@ -1,4 +1,11 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from . import metrics as collector
 
 
 def page_not_found(request, exception):
@@ -15,8 +22,29 @@ def csrf_failure(request, reason=''):
 
 
 def permission_denied(request, exception):
-    return render(request, 'core/403.html')
+    return render(request, 'core/403.html', status=403)
 
 
 def server_error(request):
     return render(request, 'core/500.html')
+
+
+@require_GET
+def metrics(request):
+    """Метрики всех воркеров для Prometheus.
+
+    Доступ — по заголовку «Authorization: Bearer <METRICS_TOKEN>» или
+    сотруднику. Адрес клиента не проверяется: за прокси на той же машине
+    он у всех запросов локальный.
+    """
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = bool(token) and constant_time_compare(
+        header, f'Bearer {token}'
+    )
+    if not (authorized or request.user.is_staff):
+        raise PermissionDenied
+    return HttpResponse(
+        collector.render(collector.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
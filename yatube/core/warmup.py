@@ -0,0 +1,105 @@
+"""Прогрев воркера до первого запроса.
+
+Вызывается из yatube/wsgi.py при WSGI_WARMUP. С gunicorn --preload
+прогрев выполняется один раз в главном процессе, и воркеры
+наследуют уже загруженные URLconf, скомпилированные шаблоны и каталоги
+переводов.
+"""
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+from django.utils import translation
+
+
+def urls():
+    """Импортирует все URLconf и строит таблицы reverse()."""
+    resolver = get_resolver()
+    return len(resolver.reverse_dict) + len(resolver.namespace_dict)
+
+
+def templates():
+    """Компилирует все шаблоны из templates/.
+
+    Скомпилированные шаблоны остаются в памяти только с кеширующим
+    загрузчиком; при WSGI_WARMUP он включается в settings.
+    """
+    engine = engines['django']
+    count = 0
+    for root, _, files in os.walk(settings.TEMPLATES_DIR):
+        for name in files:
+            if name.endswith('.html'):
+                path = os.path.join(root, name)
+                engine.get_template(
+                    os.path.relpath(path, settings.TEMPLATES_DIR)
+                    .replace(os.sep, '/')
+                )
+                count += 1
+    return count
+
+
+def translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Yes')
+    return settings.LANGUAGE_CODE
+
+
+def thumbnails():
+    """Создаёт движок, бэкенд, хранилище ключей и файлов sorl."""
+    from sorl.thumbnail import default
+    parts = (default.backend, default.engine, default.kvstore, default.storage)
+    # Обращение к __class__ настраивает ленивый объект.
+    return len([part.__class__ for part in parts])
+
+
+def availability():
+    """Строит фильтры проверки занятости имени и почты."""
+    from users.availability import build
+    build()
+    return 'ok'
+
+
+STEPS = (
+    ('urls', urls),
+    ('templates', templates),
+    ('translations', translations),
+    ('thumbnails', thumbnails),
+    ('availability', availability),
+)
+
+
+def run(imported=None, steps=STEPS, stream=None):
+    """Выполняет шаги прогрева и печатает их время.
+
+    imported — сколько секунд занял импорт приложения до вызова.
+    Ошибка шага попадает в отчёт, но не останавливает запуск.
+    Возвращает [(шаг, миллисекунды, результат)].
+    """
+    timings = []
+    if imported is not None:
+        timings.append(('import', imported * 1000, ''))
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            result = step()
+        except Exception as error:
+            # Прогрев не должен мешать воркеру запуститься.
+            result = f'ошибка: {error!r}'
+        timings.append((name, (time.perf_counter() - started) * 1000, result))
+    # Соединения с базой не должны перейти в воркеры после fork.
+    connections.close_all()
+    total = sum(ms for _, ms, _ in timings)
+    (stream or sys.stderr).write(
+        f'Прогрев процесса {os.getpid()}: '
+        + ', '.join(
+            f'{name} {ms:.0f} мс ({result})' if result != ''
+            else f'{name} {ms:.0f} мс'
+            for name, ms, result in timings
+        )
+        + f'; всего {total:.0f} мс\n'
+    )
+    return timings
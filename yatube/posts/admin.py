@@ -1,6 +1,22 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 
-from .models import Group, Post
+from . import bulk, tasks
+from .models import Comment, Follow, Group, Post
+
+
+class GroupChoiceForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        empty_label='без группы'
+    )
+
+
+class MoveToGroupForm(ActionForm, GroupChoiceForm):
+    """Форма действий списка постов с выбором группы для переноса."""
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -9,7 +25,81 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    action_form = MoveToGroupForm
+    actions = ('move_to_group',)
+
+    def move_to_group(self, request, queryset):
+        form = GroupChoiceForm(request.POST)
+        if not form.is_valid():
+            self.message_user(request, 'Неверная группа.', messages.ERROR)
+            return
+        moved = bulk.move_posts(queryset, form.cleaned_data['group'])
+        self.message_user(
+            request, f'Перенесено постов: {moved}.', messages.SUCCESS
+        )
+    move_to_group.short_description = 'Перенести в выбранную группу'
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+    actions = ('delete_in_background',)
+
+    def delete_in_background(self, request, queryset):
+        for group_id in queryset.values_list('pk', flat=True):
+            tasks.delete_group.delay(group_id)
+        self.message_user(
+            request,
+            'Удаление групп поставлено в очередь.',
+            messages.SUCCESS
+        )
+    delete_in_background.short_description = 'Удалить пачками в фоне'
+
+
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author',)
+    search_fields = ('text', 'author__username')
+    list_filter = ('created',)
+    raw_id_fields = ('author', 'post', 'parent')
+    actions = ('delete_with_replies',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_with_replies(self, request, queryset):
+        deleted = bulk.delete_comments(queryset)
+        self.message_user(
+            request,
+            f'Удалено комментариев вместе с ответами: {deleted}.',
+            messages.SUCCESS
+        )
+    delete_with_replies.short_description = 'Удалить вместе с ответами'
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    raw_id_fields = ('user', 'author')
+    actions = ('delete_follows',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_follows(self, request, queryset):
+        deleted = bulk.delete_follows(queryset)
+        self.message_user(
+            request, f'Удалено подписок: {deleted}.', messages.SUCCESS
+        )
+    delete_follows.short_description = 'Удалить выбранные подписки'
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,116 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from core import changes
+from core.models import ChangeEvent
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_COLUMNS = (
+    'id', 'text', 'excerpt', 'has_more', 'pub_date',
+    'author_id', 'group_id', 'image', 'views',
+    'thumb', 'thumb_width', 'thumb_height',
+)
+COMMENT_COLUMNS = (
+    'id', 'text', 'created', 'author_id', 'post_id',
+    'parent_id', 'path', 'depth',
+)
+
+state = threading.local()
+
+
+def is_moving():
+    return getattr(state, 'moving', False)
+
+
+@contextmanager
+def moving():
+    """Удаления внутри — перенос в архив, а не удаление постов."""
+    state.moving = True
+    try:
+        yield
+    finally:
+        state.moving = False
+
+
+def archive_batch(cutoff, batch_size):
+    """Переносит в архив самые старые посты, опубликованные до cutoff.
+
+    Одна пачка — одна короткая транзакция: посты и их комментарии
+    копируются в архивные таблицы и удаляются из основных.
+    Возвращает число перенесённых постов.
+    """
+    ids = list(
+        Post.objects.filter(pub_date__lt=cutoff)
+        .order_by('pub_date')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    with transaction.atomic():
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row) for row in
+            Post.objects.filter(pk__in=ids).values(*POST_COLUMNS)
+        )
+        comments = Comment.objects.filter(post_id__in=ids)
+        comment_rows = list(comments.values(*COMMENT_COLUMNS))
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**row) for row in comment_rows
+        )
+        with changes.muted(), moving():
+            comments.delete()
+            Post.objects.filter(pk__in=ids).delete()
+        changes.record_many(
+            Comment, [row['id'] for row in comment_rows], ChangeEvent.ARCHIVE
+        )
+        changes.record_many(Post, ids, ChangeEvent.ARCHIVE)
+    return len(ids)
+
+
+class ChainedFeed:
+    """Лента из свежих постов, за которыми следуют архивные.
+
+    Все архивные посты старше любого свежего, поэтому порядок ленты
+    сохраняется. Архив читается только на страницах, которые до него
+    доходят.
+    """
+
+    def __init__(self, hot, cold):
+        self.hot = hot
+        self.cold = cold
+
+    def count(self):
+        if not hasattr(self, '_count'):
+            self._count = self.hot_count() + self.cold.count()
+        return self._count
+
+    def hot_count(self):
+        if not hasattr(self, '_hot_count'):
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        start, stop = key.start or 0, key.stop
+        hot_count = self.hot_count()
+        if stop <= hot_count:
+            return list(self.hot[start:stop])
+        if start >= hot_count:
+            return list(self.cold[start - hot_count:stop - hot_count])
+        return list(self.hot[start:]) + list(self.cold[:stop - hot_count])
+
+
+def find_post(post_id):
+    """Пост по id из основной таблицы, а если его там нет — из архива."""
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        post = ArchivedPost.objects.select_related('author', 'group').filter(
+            pk=post_id
+        ).first()
+    return post
@@ -0,0 +1,116 @@
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+
+from core import changes
+from core.models import ChangeEvent
+
+from . import follow_cache, months, tasks
+from .models import Comment, Follow, Post
+from .threads import PATH_END
+
+BATCH_SIZE = 500
+
+
+def id_batches(queryset, batch_size, *fields):
+    """Строки queryset пачками по возрастанию pk, без OFFSET.
+
+    Следующая пачка начинается после последнего pk предыдущей, поэтому
+    строки, которые после обработки всё ещё подходят под фильтр, не
+    читаются повторно.
+    """
+    queryset = queryset.order_by('pk')
+    last = None
+    while True:
+        batch = queryset if last is None else queryset.filter(pk__gt=last)
+        rows = list(batch.values_list('pk', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def raw_delete(model, ids):
+    batch = model.objects.filter(pk__in=ids)
+    batch._raw_delete(batch.db)
+    changes.record_many(model, ids, ChangeEvent.DELETE)
+
+
+def move_posts(queryset, group, batch_size=BATCH_SIZE):
+    """Переносит посты в группу (или убирает из групп, если None).
+
+    Одна пачка — один UPDATE; помесячные счётчики групп правятся
+    сразу на число постов месяца, а не по одному посту.
+    Возвращает число перенесённых постов.
+    """
+    group_id = group.pk if group is not None else None
+    if group_id is None:
+        queryset = queryset.filter(group__isnull=False)
+    else:
+        queryset = queryset.exclude(group_id=group_id)
+    done = 0
+    for rows in id_batches(queryset, batch_size, 'group_id', 'pub_date'):
+        ids = [pk for pk, _, _ in rows]
+        moved = Counter()
+        for _, old_group_id, pub_date in rows:
+            month = months.month_of(pub_date)
+            if old_group_id is not None:
+                moved[months.group_scope(old_group_id), month] -= 1
+            if group_id is not None:
+                moved[months.group_scope(group_id), month] += 1
+        with transaction.atomic():
+            Post.objects.filter(pk__in=ids).update(group_id=group_id)
+            changes.record_many(Post, ids, ChangeEvent.UPDATE)
+            for (scope, month), delta in moved.items():
+                months.adjust([scope], month, delta)
+        done += len(ids)
+    return done
+
+
+def delete_comments(queryset, batch_size=BATCH_SIZE):
+    """Удаляет комментарии вместе со всеми ответами на них.
+
+    Ответы каждого комментария — диапазон путей, так что пачка
+    выбранных комментариев превращается в один SELECT id по диапазонам
+    и DELETE по этим id. SELECT идёт в той же транзакции, что и DELETE:
+    иначе ответ, добавленный между ними, остался бы без родителя.
+    Возвращает число удалённых комментариев.
+    """
+    done = 0
+    for rows in id_batches(queryset, batch_size, 'post_id', 'path'):
+        subtrees = Q()
+        for _, post_id, path in rows:
+            subtrees |= Q(
+                post_id=post_id, path__gte=path, path__lt=path + PATH_END
+            )
+        with transaction.atomic():
+            ids = list(
+                Comment.objects.filter(subtrees).values_list('pk', flat=True)
+            )
+            for start in range(0, len(ids), batch_size):
+                raw_delete(Comment, ids[start:start + batch_size])
+        done += len(ids)
+    return done
+
+
+def delete_follows(queryset, batch_size=BATCH_SIZE):
+    """Удаляет подписки; кеш и рекомендации обновляются по пачке.
+
+    Возвращает число удалённых подписок.
+    """
+    done = 0
+    for rows in id_batches(queryset, batch_size, 'user_id', 'author_id'):
+        ids = [pk for pk, _, _ in rows]
+        user_ids = {user_id for _, user_id, _ in rows}
+        author_ids = {author_id for _, _, author_id in rows}
+        with transaction.atomic():
+            raw_delete(Follow, ids)
+            for user_id in user_ids:
+                tasks.refresh_follow_suggestions.delay(user_id)
+            transaction.on_commit(
+                partial(follow_cache.forget, user_ids, author_ids)
+            )
+        done += len(ids)
+    return done
@@ -0,0 +1,144 @@
+import logging
+from functools import partial
+
+from django.db import transaction
+from sorl.thumbnail import delete as delete_image
+
+from core import changes
+from core.models import ChangeEvent
+
+from . import follow_cache
+from .models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                     FollowSuggestion, Group, Post, User)
+
+logger = logging.getLogger(__name__)
+
+
+def log_progress(label, done):
+    logger.info('%s: %s', label, done)
+
+
+def batches(queryset, batch_size, *fields):
+    """Пачки строк queryset; каждая следующая читается после обработки."""
+    fields = fields or ('pk',)
+    while True:
+        rows = list(queryset.values_list(*fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+
+
+def forget_follows(queryset):
+    """Сбрасывает кеш подписок после удаления строк queryset без сигналов."""
+    rows = list(queryset.values_list('user_id', 'author_id'))
+    transaction.on_commit(partial(
+        follow_cache.forget,
+        {user_id for user_id, _ in rows},
+        {author_id for _, author_id in rows}
+    ))
+
+
+def delete_in_batches(queryset, label, batch_size, progress, raw=False):
+    """Удаляет строки queryset короткими транзакциями по batch_size.
+
+    raw=True удаляет одним DELETE без загрузки объектов и без сигналов:
+    годится для таблиц, на которые никто не ссылается.
+    """
+    model = queryset.model
+    done = 0
+    for rows in batches(queryset, batch_size):
+        ids = [pk for pk, in rows]
+        batch = model.objects.filter(pk__in=ids)
+        with transaction.atomic():
+            if raw:
+                if model is Follow:
+                    forget_follows(batch)
+                    changes.record_many(model, ids, ChangeEvent.DELETE)
+                batch._raw_delete(batch.db)
+            else:
+                batch.delete()
+        done += len(rows)
+        progress(label, done)
+    return done
+
+
+def delete_posts_in_batches(queryset, label, batch_size, progress):
+    """Удаляет посты пачками и затем их картинки с миниатюрами.
+
+    Файлы удаляются только после коммита пачки: при откате строки
+    остались бы ссылаться на удалённые картинки.
+    """
+    model = queryset.model
+    done = 0
+    for rows in batches(queryset, batch_size, 'pk', 'image'):
+        with transaction.atomic():
+            model.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+            transaction.on_commit(partial(
+                remove_orphan_images, [image for _, image in rows]
+            ))
+        done += len(rows)
+        progress(label, done)
+    return done
+
+
+def remove_orphan_images(names):
+    names = {name for name in names if name}
+    referenced = set(
+        Post.objects.filter(image__in=names).values_list('image', flat=True)
+    ) | set(
+        ArchivedPost.objects.filter(image__in=names)
+        .values_list('image', flat=True)
+    )
+    for name in names - referenced:
+        delete_image(name)
+
+
+def delete_user(user_id, batch_size=500, progress=log_progress):
+    """Удаляет пользователя и всё, что на него ссылается, пачками.
+
+    Сначала удаляются комментарии и подписки, потом посты, и только
+    в конце сам пользователь, когда каскаду Django уже нечего собирать.
+    """
+    steps = (
+        (Comment.objects.filter(author_id=user_id), 'comments', False),
+        (Comment.objects.filter(post__author_id=user_id),
+         'comments on posts', False),
+        (ArchivedComment.objects.filter(author_id=user_id),
+         'archived comments', True),
+        (ArchivedComment.objects.filter(post__author_id=user_id),
+         'archived comments on posts', True),
+        (Follow.objects.filter(user_id=user_id), 'follows', True),
+        (Follow.objects.filter(author_id=user_id), 'followers', True),
+        (FollowSuggestion.objects.filter(user_id=user_id),
+         'suggestions', True),
+        (FollowSuggestion.objects.filter(author_id=user_id),
+         'suggested to others', True),
+    )
+    for queryset, label, raw in steps:
+        delete_in_batches(queryset, label, batch_size, progress, raw=raw)
+    for model in (Post, ArchivedPost):
+        delete_posts_in_batches(
+            model.objects.filter(author_id=user_id),
+            model._meta.verbose_name_plural,
+            batch_size,
+            progress
+        )
+    User.objects.filter(pk=user_id).delete()
+    progress('user', 1)
+
+
+def delete_group(group_id, batch_size=500, progress=log_progress):
+    """Отвязывает посты от группы пачками и удаляет группу."""
+    for model in (Post, ArchivedPost):
+        queryset = model.objects.filter(group_id=group_id)
+        done = 0
+        for rows in batches(queryset, batch_size):
+            ids = [pk for pk, in rows]
+            with transaction.atomic():
+                model.objects.filter(pk__in=ids).update(group=None)
+                if model is Post:
+                    changes.record_many(model, ids, ChangeEvent.UPDATE)
+            done += len(rows)
+            progress(f'{model._meta.verbose_name_plural} detached', done)
+    Group.objects.filter(pk=group_id).delete()
+    progress('group', 1)
@@ -0,0 +1,96 @@
+import random
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Follow
+
+FOLLOWING_KEY = 'following_{}'
+FOLLOWERS_KEY = 'followers_count_{}'
+
+
+def shared():
+    """Кеш общий для всех воркеров: подписку могли оформить в другом."""
+    return caches['shared']
+
+
+def versioned(template, object_id):
+    """Ключ значения для текущей версии объекта.
+
+    Изменение подписок увеличивает версию (bump), и значение, прочитанное
+    из базы до коммита, ляжет под старый ключ, который уже никто не
+    читает. Первая версия случайна: если ключ версии вытеснят, новая не
+    совпадёт со старой.
+    """
+    base = template.format(object_id)
+    version_key = f'{base}_version'
+    version = shared().get(version_key)
+    if version is None:
+        shared().add(version_key, random.getrandbits(48), None)
+        version = shared().get(version_key, 0)
+    return f'{base}_{version}'
+
+
+def bump(template, object_id):
+    try:
+        shared().incr(f'{template.format(object_id)}_version')
+    except ValueError:
+        # Версии нет: следующий читатель начнёт новую, случайную.
+        pass
+
+
+def cached(template, object_id, load):
+    key = versioned(template, object_id)
+    value = shared().get(key)
+    if value is None:
+        value = load(object_id)
+        shared().add(key, value, settings.FOLLOW_CACHE_TIMEOUT)
+    return value
+
+
+def load_following(user_id):
+    return array('q', sorted(set(
+        Follow.objects.filter(user_id=user_id)
+        .values_list('author_id', flat=True)
+    )))
+
+
+def following_ids(user_id):
+    """Отсортированный массив id авторов, на которых подписан user_id."""
+    return cached(FOLLOWING_KEY, user_id, load_following)
+
+
+def contains(ids, value):
+    position = bisect_left(ids, value)
+    return position < len(ids) and ids[position] == value
+
+
+def is_following(user_id, author_id):
+    return contains(following_ids(user_id), author_id)
+
+
+def followers_count(author_id):
+    return cached(
+        FOLLOWERS_KEY,
+        author_id,
+        lambda pk: Follow.objects.filter(author_id=pk).count()
+    )
+
+
+def follow_changed(user_id, author_id):
+    """Сбрасывает подписки user_id и число подписчиков author_id.
+
+    Вызывается после коммита; значения перечитываются из базы при
+    следующем обращении.
+    """
+    forget([user_id], [author_id])
+
+
+def forget(user_ids, author_ids):
+    """Сбрасывает кеш после изменения подписок, в том числе массового."""
+    for user_id in user_ids:
+        bump(FOLLOWING_KEY, user_id)
+    for author_id in author_ids:
+        bump(FOLLOWERS_KEY, author_id)
@@ -1,4 +1,4 @@
-from django.forms import ModelForm
+from django.forms import HiddenInput, IntegerField, ModelForm, ValidationError
 
 from .models import Comment, Post
 
@@ -18,6 +18,27 @@ class PostForm(ModelForm):
 
 
 class CommentForm(ModelForm):
+    parent = IntegerField(required=False, widget=HiddenInput)
+
     class Meta:
         model = Comment
         fields = ('text',)
+
+    def __init__(self, *args, post=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.post = post
+
+    def clean_parent(self):
+        parent_id = self.cleaned_data['parent']
+        if parent_id is None:
+            return None
+        parent = Comment.objects.filter(
+            pk=parent_id, post=self.post
+        ).only('pk', 'path', 'depth', 'parent').first()
+        if parent is None:
+            raise ValidationError('Комментарий для ответа не найден')
+        return parent
+
+    def save(self, commit=True):
+        self.instance.parent = self.cleaned_data['parent']
+        return super().save(commit)
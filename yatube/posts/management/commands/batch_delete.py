@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.deletion import delete_group, delete_user
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пользователя или группу вместе со связанными данными '
+        'пачками в коротких транзакциях.'
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument('--user', help='Имя пользователя.')
+        target.add_argument('--group', help='Слаг группы.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['user']:
+            model, lookup, delete = User, 'username', delete_user
+            value = options['user']
+        elif not options['group']:
+            raise CommandError('Укажите --user или --group.')
+        else:
+            model, lookup, delete = Group, 'slug', delete_group
+            value = options['group']
+        pk = model.objects.filter(**{lookup: value}).values_list(
+            'pk', flat=True
+        ).first()
+        if pk is None:
+            raise CommandError(f'Не найдено: {value}')
+        delete(pk, options['batch_size'], self.report)
+        self.stdout.write(self.style.SUCCESS('Готово'))
+
+    def report(self, label, done):
+        self.stdout.write(f'{label}: {done}')
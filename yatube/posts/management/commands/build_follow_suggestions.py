@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «на кого подписаться» для всех.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=settings.FOLLOW_SUGGESTIONS_COUNT,
+            help='Сколько авторов рекомендовать каждому пользователю.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        users = build_all(options['count'], options['batch_size'])
+        self.stdout.write(
+            f'Пользователей: {users}, '
+            f'время: {time.monotonic() - started:.2f} с'
+        )
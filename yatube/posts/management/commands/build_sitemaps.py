@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит sitemap по шардам и перестраивает только те шарды, '
+        'в которых что-то изменилось.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить все шарды.'
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = build(force=options['force'])
+        self.stdout.write(
+            f'Перестроено шардов: {len(rebuilt)} {", ".join(rebuilt)}'
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import ArchivedPost, Post
+from posts.thumbnails import generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт миниатюры и сохраняет их размеры для постов, у которых '
+        'их ещё нет.'
+    )
+
+    def handle(self, *args, **options):
+        done = 0
+        for model in (Post, ArchivedPost):
+            ids = model.objects.exclude(image='').filter(
+                thumb=''
+            ).values_list('pk', flat=True)
+            for post_id in ids.iterator():
+                generate(post_id)
+                done += 1
+        self.stdout.write(f'Обработано постов: {done}')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.months import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает помесячные счётчики постов, если они разошлись '
+        'с таблицами постов.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Записано счётчиков: {rebuild()}')
@@ -0,0 +1,161 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import months
+from posts.models import Group, Post, PostMonthCount, User
+from posts.thumbnails import generate
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кеши после выкладки: строит миниатюры и запрашивает '
+        'первые страницы ленты, самых активных групп и авторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default=settings.WARM_BASE_URL,
+            help='Адрес запущенного сервера.'
+        )
+        parser.add_argument('--pages', type=int, default=3)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--profiles', type=int, default=5)
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=3,
+            help='Активность групп и авторов считается за столько месяцев.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Сколько запросов и миниатюр обрабатывать одновременно.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help=(
+                'Сколько раз запросить каждую страницу: кеш LocMemCache '
+                'у каждого воркера свой.'
+            )
+        )
+        parser.add_argument('--timeout', type=float, default=10)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        since = months.month_of(
+            timezone.now() - timedelta(days=31 * (options['months'] - 1))
+        )
+        groups = top_scopes('group:', since, options['groups'])
+        authors = top_scopes('author:', since, options['profiles'])
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            ids = post_ids(options['pages'], groups, authors)
+            built = sum(pool.map(build_thumbnail, ids))
+            self.stdout.write(
+                f'Миниатюры: построено {built} за '
+                f'{time.monotonic() - started:.1f} с'
+            )
+            urls = [
+                options['base_url'].rstrip('/') + path
+                for path in paths(options['pages'], groups, authors)
+            ] * options['repeat']
+            results = list(pool.map(
+                lambda url: fetch(url, options['timeout']), urls
+            ))
+        failed = 0
+        for url, status, seconds in results:
+            self.stdout.write(f'{status} {seconds * 1000:7.0f} мс {url}')
+            failed += status != 200
+        self.stdout.write(
+            f'Страниц: {len(results)}, ошибок: {failed}, всего '
+            f'{time.monotonic() - started:.1f} с'
+        )
+        if failed:
+            raise CommandError(f'Не прогрето страниц: {failed}')
+
+
+def top_scopes(prefix, since, limit):
+    """id групп или авторов с наибольшим числом постов с месяца since.
+
+    Считается по помесячным счётчикам, а не по таблице постов.
+    """
+    rows = PostMonthCount.objects.filter(
+        scope__startswith=prefix, month__gte=since
+    ).values('scope').annotate(total=Sum('count')).order_by('-total')
+    return [int(row['scope'][len(prefix):]) for row in rows[:limit]]
+
+
+def in_order(model, ids, field):
+    values = dict(model.objects.filter(pk__in=ids).values_list('pk', field))
+    return [values[pk] for pk in ids if pk in values]
+
+
+def paths(pages, group_ids, author_ids):
+    index = reverse('posts:index')
+    return [
+        f'{index}?page={page}' for page in range(1, pages + 1)
+    ] + [
+        reverse('posts:group_list', args=(slug,))
+        for slug in in_order(Group, group_ids, 'slug')
+    ] + [
+        reverse('posts:profile', args=(username,))
+        for username in in_order(User, author_ids, 'username')
+    ]
+
+
+def post_ids(pages, group_ids, author_ids):
+    """Посты без миниатюр на страницах, которые будут прогреты."""
+    count = settings.PAGINATOR_COUNT
+    missing = Post.objects.exclude(image='').filter(thumb='')
+    feeds = [Post.objects.all()[:pages * count]] + [
+        Post.objects.filter(group_id=pk)[:count] for pk in group_ids
+    ] + [
+        Post.objects.filter(author_id=pk)[:count] for pk in author_ids
+    ]
+    ids = set()
+    for posts in feeds:
+        ids.update(missing.filter(
+            pk__in=list(posts.values_list('pk', flat=True))
+        ).values_list('pk', flat=True))
+    return sorted(ids)
+
+
+def build_thumbnail(post_id):
+    try:
+        generate(post_id)
+        return 1
+    except Exception:
+        logger.exception('Не удалось построить миниатюру поста %s', post_id)
+        return 0
+    finally:
+        connection.close()
+
+
+def fetch(url, timeout):
+    """(url, код ответа или текст ошибки, секунды)."""
+    started = time.monotonic()
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except HTTPError as error:
+        status = error.code
+    except (URLError, OSError) as error:
+        status = str(getattr(error, 'reason', error))
+    return url, status, time.monotonic() - started
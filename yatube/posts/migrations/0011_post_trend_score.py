@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:31
+
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_trend_score(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    epoch = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    tau = settings.TRENDING_HALF_LIFE / math.log(2)
+    weight = math.log(settings.TRENDING_WEIGHTS['post'])
+    for pk, pub_date in Post.objects.values_list('pk', 'pub_date').iterator():
+        Post.objects.filter(pk=pk).update(
+            trend_score=weight + (pub_date - epoch).total_seconds() / tau
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_followsuggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trend_score',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.RunPython(fill_trend_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:51
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_counts(apps, schema_editor):
+    PostMonthCount = apps.get_model('posts', 'PostMonthCount')
+    counts = Counter()
+    for name in ('Post', 'ArchivedPost'):
+        rows = apps.get_model('posts', name).objects.values_list(
+            'author_id', 'group_id', 'pub_date'
+        ).order_by().iterator()
+        for author_id, group_id, pub_date in rows:
+            month = timezone.localtime(pub_date).date().replace(day=1)
+            counts['all', month] += 1
+            counts[f'author:{author_id}', month] += 1
+            if group_id is not None:
+                counts[f'group:{group_id}', month] += 1
+    PostMonthCount.objects.bulk_create(
+        PostMonthCount(scope=scope, month=month, count=count)
+        for (scope, month), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMonthCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50)),
+                ('month', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-month',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date'], name='posts_post_pub_dat_efcc38_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='posts_post_group_i_1fdac4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='posts_post_author__7827da_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='postmonthcount',
+            unique_together={('scope', 'month')},
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
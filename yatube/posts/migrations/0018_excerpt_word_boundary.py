@@ -0,0 +1,37 @@
+from django.db import migrations
+
+EXCERPT_LENGTH = 300
+ELLIPSIS = '…'
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    # Копия posts.models.make_excerpt на момент миграции.
+    if len(text) <= length:
+        return text
+    budget = length - len(ELLIPSIS)
+    head = text[:budget]
+    words = head
+    if not text[budget].isspace():
+        parts = head.rsplit(None, 1)
+        if len(parts) == 2 and len(parts[0].strip()) >= budget // 2:
+            words = parts[0]
+    return words.rstrip() + ELLIPSIS
+
+
+def refill_excerpts(apps, schema_editor):
+    for name in ('Post', 'ArchivedPost'):
+        model = apps.get_model('posts', name)
+        rows = model.objects.filter(has_more=True).values_list('pk', 'text')
+        for pk, text in rows.iterator():
+            model.objects.filter(pk=pk).update(excerpt=make_excerpt(text))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RunPython(refill_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,57 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+
+from core.models import TrackedModel
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+ELLIPSIS = '…'
+
+COMMENT_MAX_DEPTH = 5
+# Ширина одного сегмента пути: id комментария с ведущими нулями.
+COMMENT_PATH_STEP = 10
+COMMENT_PATH_LENGTH = COMMENT_PATH_STEP * (COMMENT_MAX_DEPTH + 1)
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Начало текста не длиннее length, обрезанное по границе слова.
+
+    Если до границы слова пришлось бы выбросить больше половины отрывка
+    (длинная ссылка, слово без пробелов), текст режется посреди слова.
+    """
+    if len(text) <= length:
+        return text
+    budget = length - len(ELLIPSIS)
+    head = text[:budget]
+    words = head
+    if not text[budget].isspace():
+        parts = head.rsplit(None, 1)
+        if len(parts) == 2 and len(parts[0].strip()) >= budget // 2:
+            words = parts[0]
+    return words.rstrip() + ELLIPSIS
+
+
+class Thumbnailed(models.Model):
+    """Готовая миниатюра картинки для лент, читается вместе с постом."""
+    thumb = models.CharField(max_length=255, blank=True, editable=False)
+    thumb_width = models.PositiveSmallIntegerField(
+        blank=True, null=True, editable=False
+    )
+    thumb_height = models.PositiveSmallIntegerField(
+        blank=True, null=True, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def thumb_url(self):
+        return default_storage.url(self.thumb)
+
 
-class Group(models.Model):
+class Group(TrackedModel):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
@@ -13,8 +60,12 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class Post(TrackedModel, Thumbnailed):
+    is_archived = False
+
     text = models.TextField()
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True)
+    has_more = models.BooleanField(default=False)
     pub_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(
         User,
@@ -32,15 +83,34 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    trend_score = models.FloatField(default=0, db_index=True)
+    views = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['-pub_date']),
+            models.Index(fields=['group', '-pub_date']),
+            models.Index(fields=['author', '-pub_date']),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        self.has_more = self.excerpt != self.text
+        super().save(*args, **kwargs)
+
 
-class Comment(models.Model):
+class Comment(TrackedModel):
+    """Комментарий в дереве ответов.
+
+    path — id всех предков и самого комментария, дополненные нулями до
+    COMMENT_PATH_STEP и склеенные подряд. Сортировка по path выдаёт
+    дерево в порядке обхода, а любое поддерево занимает непрерывный
+    диапазон индекса (post, path).
+    """
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(
@@ -53,9 +123,37 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='replies'
+    )
+    path = models.CharField(max_length=COMMENT_PATH_LENGTH, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path']),
+        ]
 
-class Follow(models.Model):
+    def save(self, *args, **kwargs):
+        if self.path:
+            return super().save(*args, **kwargs)
+        if self.parent_id is not None:
+            if self.parent.depth >= COMMENT_MAX_DEPTH:
+                # Глубже не вкладываем: ответ встаёт рядом с родителем.
+                self.parent = self.parent.parent
+            self.depth = self.parent.depth + 1
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            prefix = self.parent.path if self.parent_id else ''
+            self.path = prefix + str(self.pk).zfill(COMMENT_PATH_STEP)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+
+class Follow(TrackedModel):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -66,3 +164,112 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-score',)
+        indexes = [
+            models.Index(fields=['user', '-score']),
+        ]
+
+
+class ArchivedPost(Thumbnailed):
+    """Пост, перенесённый из posts_post; id совпадает с исходным."""
+    is_archived = True
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True)
+    has_more = models.BooleanField(default=False)
+    pub_date = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='archived_posts'
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    views = models.PositiveIntegerField(default=0)
+    archived = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['-pub_date']),
+            models.Index(fields=['group', '-pub_date']),
+            models.Index(fields=['author', '-pub_date']),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    created = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    # Без ограничения в БД: ответы переживают пакетное удаление
+    # комментариев пользователя, дерево держится на path.
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    path = models.CharField(max_length=COMMENT_PATH_LENGTH)
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path']),
+        ]
+
+
+class PostMonthCount(models.Model):
+    """Число постов за месяц в ленте: всей, группы или автора.
+
+    Учитываются и основные, и архивные посты, поэтому перенос в архив
+    счётчики не меняет.
+    """
+    scope = models.CharField(max_length=50)
+    month = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-month',)
+        unique_together = ('scope', 'month')
@@ -0,0 +1,112 @@
+import datetime
+from collections import Counter
+from itertools import groupby
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ArchivedPost, Post, PostMonthCount
+
+ALL = 'all'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def scopes_for(author_id, group_id):
+    """Ленты, в которые попадает пост."""
+    scopes = [ALL, author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(group_scope(group_id))
+    return scopes
+
+
+def month_of(moment):
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def month_range(year, month):
+    """Начало месяца и начало следующего; ValueError для неверной даты."""
+    start = datetime.datetime(year, month, 1)
+    end = (start + datetime.timedelta(days=32)).replace(day=1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def adjust(scopes, month, delta):
+    """Меняет счётчики месяца на delta; опустевшие строки удаляются."""
+    for scope in scopes:
+        updated = PostMonthCount.objects.filter(
+            scope=scope, month=month
+        ).update(count=F('count') + delta)
+        if updated or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                PostMonthCount.objects.create(
+                    scope=scope, month=month, count=delta
+                )
+        except IntegrityError:
+            # Строку только что создал параллельный запрос.
+            PostMonthCount.objects.filter(
+                scope=scope, month=month
+            ).update(count=F('count') + delta)
+    if delta < 0:
+        PostMonthCount.objects.filter(
+            scope__in=scopes, month=month, count=0
+        ).delete()
+
+
+def post_added(post, delta=1):
+    adjust(
+        scopes_for(post.author_id, post.group_id),
+        month_of(post.pub_date),
+        delta
+    )
+
+
+def post_removed(post):
+    post_added(post, -1)
+
+
+def group_changed(post, old_group_id):
+    month = month_of(post.pub_date)
+    if old_group_id is not None:
+        adjust([group_scope(old_group_id)], month, -1)
+    if post.group_id is not None:
+        adjust([group_scope(post.group_id)], month, 1)
+
+
+def calendar(scope):
+    """Месяцы ленты с числом постов, по годам: [(год, [строки])]."""
+    rows = PostMonthCount.objects.filter(scope=scope, count__gt=0).values(
+        'month', 'count'
+    )
+    return [
+        (year, list(months))
+        for year, months in groupby(rows, lambda row: row['month'].year)
+    ]
+
+
+def rebuild():
+    """Пересчитывает все счётчики по постам одним проходом."""
+    counts = Counter()
+    for model in (Post, ArchivedPost):
+        rows = model.objects.values_list(
+            'author_id', 'group_id', 'pub_date'
+        ).order_by().iterator()
+        for author_id, group_id, pub_date in rows:
+            for scope in scopes_for(author_id, group_id):
+                counts[scope, month_of(pub_date)] += 1
+    with transaction.atomic():
+        PostMonthCount.objects.all().delete()
+        PostMonthCount.objects.bulk_create(
+            PostMonthCount(scope=scope, month=month, count=count)
+            for (scope, month), count in counts.items()
+        )
+    return len(counts)
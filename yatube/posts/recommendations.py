@@ -0,0 +1,171 @@
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Follow, FollowSuggestion, User
+
+POPULAR_CACHE_KEY = 'follow_popular'
+REFRESH_PENDING_KEY = 'follow_refresh_pending_{}'
+
+
+def load_graph():
+    """Загружает граф подписок в формате CSR.
+
+    Авторы, на которых подписан пользователь u, лежат в
+    indices[indptr[u]:indptr[u + 1]]; popularity[a] — число подписчиков a.
+    """
+    edges = np.fromiter(
+        chain.from_iterable(
+            Follow.objects.values_list('user_id', 'author_id').iterator()
+        ),
+        dtype=np.int64
+    ).reshape(-1, 2)
+    # Пользователи, созданные между запросами, могут уже попасть в
+    # подписки: размер должен покрывать и их.
+    size = max(
+        User.objects.order_by('-pk').values_list('pk', flat=True).first()
+        or 0,
+        edges.max() if edges.size else 0
+    ) + 1
+    keys = np.unique(edges[:, 0] * size + edges[:, 1])
+    users, authors = keys // size, keys % size
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(users, minlength=size), out=indptr[1:])
+    popularity = np.bincount(authors, minlength=size)
+    return indptr, authors, popularity
+
+
+def recommend(graph, user_id, count):
+    """Друзья друзей, упорядоченные по числу общих подписок.
+
+    Если их не хватает, список дополняется самыми популярными авторами.
+    Возвращает пары (author_id, score).
+    """
+    indptr, indices, popularity = graph
+    if user_id < len(indptr) - 1:
+        followed = indices[indptr[user_id]:indptr[user_id + 1]]
+    else:
+        # Пользователь появился после загрузки графа: подписок в нём нет.
+        followed = indices[:0]
+    starts = indptr[followed]
+    lengths = indptr[followed + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    candidates = indices[offsets + np.arange(lengths.sum())]
+    excluded = np.append(followed, user_id)
+    candidates = candidates[~np.isin(candidates, excluded)]
+    authors, scores = np.unique(candidates, return_counts=True)
+    order = np.lexsort((-popularity[authors], -scores))[:count]
+    result = list(zip(authors[order].tolist(), scores[order].tolist()))
+    if len(result) < count:
+        taken = np.concatenate((excluded, authors))
+        popular = np.argsort(-popularity, kind='stable')
+        popular = popular[popularity[popular] > 0]
+        popular = popular[~np.isin(popular, taken)][:count - len(result)]
+        result += [(author, 0) for author in popular.tolist()]
+    return result
+
+
+def save_suggestions(rows_by_user):
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=rows_by_user).delete()
+        FollowSuggestion.objects.bulk_create(
+            FollowSuggestion(user_id=user_id, author_id=author, score=score)
+            for user_id, rows in rows_by_user.items()
+            for author, score in rows
+        )
+
+
+def build_all(count=None, batch_size=500):
+    """Пересчитывает рекомендации для всех пользователей пачками."""
+    count = count or settings.FOLLOW_SUGGESTIONS_COUNT
+    graph = load_graph()
+    popularity = graph[2]
+    popular = np.argsort(-popularity, kind='stable')
+    popular = popular[popularity[popular] > 0][:settings.FOLLOW_POPULAR_LIMIT]
+    caches['shared'].set(
+        POPULAR_CACHE_KEY,
+        popular.tolist(),
+        settings.FOLLOW_POPULAR_CACHE_TIMEOUT
+    )
+    batch = {}
+    total = 0
+    for user_id in User.objects.values_list('pk', flat=True).iterator():
+        batch[user_id] = recommend(graph, user_id, count)
+        if len(batch) >= batch_size:
+            save_suggestions(batch)
+            total += len(batch)
+            batch = {}
+    save_suggestions(batch)
+    return total + len(batch)
+
+
+def popular_authors():
+    """Самые популярные авторы, от большего числа подписчиков.
+
+    Полный GROUP BY по подпискам выполняется не при каждом пересчёте,
+    а раз в FOLLOW_POPULAR_CACHE_TIMEOUT (и при каждом build_all).
+    """
+    cache = caches['shared']
+    authors = cache.get(POPULAR_CACHE_KEY)
+    if authors is None:
+        authors = list(
+            Follow.objects.values('author_id')
+            .annotate(followers=Count('user_id', distinct=True))
+            .order_by('-followers', 'author_id')
+            .values_list('author_id', flat=True)[
+                :settings.FOLLOW_POPULAR_LIMIT
+            ]
+        )
+        cache.set(
+            POPULAR_CACHE_KEY, authors, settings.FOLLOW_POPULAR_CACHE_TIMEOUT
+        )
+    return authors
+
+
+def refresh_user(user_id, count=None):
+    """Пересчёт для одного пользователя после изменения его подписок.
+
+    Использует только его окрестность в графе, поэтому полный граф
+    не загружается.
+    """
+    count = count or settings.FOLLOW_SUGGESTIONS_COUNT
+    followed = set(
+        Follow.objects.filter(user_id=user_id)
+        .values_list('author_id', flat=True)
+    )
+    excluded = followed | {user_id}
+    scores = Counter(
+        author for _, author in Follow.objects.filter(user_id__in=followed)
+        .values_list('user_id', 'author_id').distinct().iterator()
+        if author not in excluded
+    )
+    popularity = dict(
+        Follow.objects.filter(author_id__in=scores).values('author_id')
+        .annotate(followers=Count('user_id', distinct=True))
+        .values_list('author_id', 'followers')
+    )
+    rows = sorted(
+        scores.items(),
+        key=lambda item: (-item[1], -popularity.get(item[0], 0), item[0])
+    )[:count]
+    if len(rows) < count:
+        taken = excluded | set(scores)
+        rows += [
+            (author, 0) for author in popular_authors()
+            if author not in taken
+        ][:count - len(rows)]
+    save_suggestions({user_id: rows})
+
+
+def suggestions_for(user, count=None):
+    count = count or settings.FOLLOW_SUGGESTIONS_COUNT
+    return [
+        suggestion.author
+        for suggestion in FollowSuggestion.objects.filter(user=user)
+        .select_related('author')[:count]
+    ]
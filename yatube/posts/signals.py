@@ -0,0 +1,130 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import changes
+
+from . import archive, follow_cache, months, tasks, thumbnails, trending
+from .models import (ArchivedPost, Comment, Follow, FollowSuggestion, Group,
+                     Post, PostMonthCount)
+
+changes.track(Group, Post, Comment, Follow)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    """Убирает автора из рекомендаций и ставит пересчёт в очередь.
+
+    Пересчёт ставится после коммита: иначе при откате флаг ждущей
+    задачи остался бы без самой задачи.
+    """
+    FollowSuggestion.objects.filter(
+        user_id=instance.user_id,
+        author_id=instance.author_id
+    ).delete()
+    transaction.on_commit(
+        partial(tasks.queue_follow_refresh, instance.user_id)
+    )
+
+
+@receiver(pre_save, sender=Post)
+def set_initial_trend_score(sender, instance, **kwargs):
+    if instance._state.adding and not instance.trend_score:
+        instance.trend_score = trending.activity_score(
+            settings.TRENDING_WEIGHTS['post']
+        )
+
+
+@receiver(post_save, sender=Post)
+def remember_new_post(sender, instance, created, **kwargs):
+    if created:
+        trending.remember(instance.pk, instance.trend_score)
+
+
+@receiver(post_save, sender=Comment)
+def comment_added(sender, instance, created, **kwargs):
+    if created:
+        trending.bump(instance.post_id, settings.TRENDING_WEIGHTS['comment'])
+
+
+@receiver(post_save, sender=Follow)
+def author_followed(sender, instance, created, **kwargs):
+    """Новая подписка поднимает последний пост автора."""
+    if not created:
+        return
+    latest = Post.objects.filter(author_id=instance.author_id).values_list(
+        'pk', flat=True
+    ).first()
+    if latest is not None:
+        trending.bump(latest, settings.TRENDING_WEIGHTS['follow'])
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def update_follow_cache(sender, instance, **kwargs):
+    if kwargs.get('created') is False:
+        return
+    transaction.on_commit(partial(
+        follow_cache.follow_changed, instance.user_id, instance.author_id
+    ))
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_values(sender, instance, raw=False, **kwargs):
+    """Запоминает группу и картинку до изменения поста.
+
+    Если картинка сменилась, старая миниатюра сбрасывается, а новая
+    строится в фоне после сохранения.
+    """
+    if raw:
+        return
+    old_group_id, old_image = None, ''
+    if not instance._state.adding:
+        old_group_id, old_image = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', 'image').first() or (None, '')
+    instance._old_group_id = old_group_id
+    instance._image_changed = (instance.image.name or '') != old_image
+    if instance._image_changed:
+        for field, value in thumbnails.EMPTY.items():
+            setattr(instance, field, value)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        months.post_added(instance)
+        return
+    old_group_id = getattr(instance, '_old_group_id', instance.group_id)
+    if old_group_id != instance.group_id:
+        months.group_changed(instance, old_group_id)
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnail(sender, instance, raw=False, **kwargs):
+    if not raw and instance._image_changed and instance.image:
+        tasks.generate_thumbnail.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def count_deleted_post(sender, instance, **kwargs):
+    """Пост удалён, если только это не перенос в архив.
+
+    Счётчики учитывают основные и архивные посты вместе.
+    """
+    if not archive.is_moving():
+        months.post_removed(instance)
+
+
+@receiver(post_delete, sender=Group)
+def forget_group_months(sender, instance, **kwargs):
+    PostMonthCount.objects.filter(
+        scope=months.group_scope(instance.pk)
+    ).delete()
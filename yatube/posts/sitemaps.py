@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import defaultdict
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ArchivedPost, Group, Post, User
+
+MANIFEST = 'manifest.json'
+INDEX = 'sitemap.xml'
+
+
+def post_rows(start, stop):
+    for model in (Post, ArchivedPost):
+        yield from model.objects.filter(
+            id__gte=start, id__lt=stop
+        ).order_by('id').values_list('id', 'pub_date').iterator()
+
+
+def post_urls(start, stop):
+    for pk, pub_date in post_rows(start, stop):
+        yield reverse('posts:post_detail', args=[pk]), pub_date
+
+
+def group_urls(start, stop):
+    for slug, in Group.objects.filter(
+        id__gte=start, id__lt=stop
+    ).order_by('id').values_list('slug').iterator():
+        yield reverse('posts:group_list', args=[slug]), None
+
+
+def profile_urls(start, stop):
+    for username, in User.objects.filter(
+        id__gte=start, id__lt=stop
+    ).order_by('id').values_list('username').iterator():
+        yield reverse('posts:profile', args=[username]), None
+
+
+def counted(models, size):
+    """Отпечаток шарда: число строк и наибольший id.
+
+    Подходит, только если адрес и дата строки не меняются после
+    создания: тогда новые строки попадают в последний шард, а удаление
+    или перенос меняют отпечаток своего шарда.
+    """
+    result = {}
+    for model in models:
+        rows = model.objects.annotate(shard=F('id') / size).values(
+            'shard'
+        ).annotate(count=Count('id'), last=Max('id')).order_by()
+        for row in rows:
+            count, last = result.get(row['shard'], (0, 0))
+            result[row['shard']] = (
+                count + row['count'], max(last, row['last'])
+            )
+    return result
+
+
+def digested(model, field, size):
+    """Отпечаток шарда: число строк и хеш пар (id, field).
+
+    Для строк, у которых поле из адреса можно изменить: переименование
+    меняет хеш, хотя число строк и наибольший id остаются прежними.
+    """
+    counts = defaultdict(int)
+    digests = defaultdict(hashlib.sha1)
+    rows = model.objects.order_by('id').values_list('id', field).iterator()
+    for pk, value in rows:
+        counts[pk // size] += 1
+        digests[pk // size].update(f'{pk}:{value}\n'.encode())
+    return {
+        shard: (count, digests[shard].hexdigest()[:16])
+        for shard, count in counts.items()
+    }
+
+
+SECTIONS = {
+    # Адрес поста — его id, а pub_date задаётся при создании.
+    'posts': (post_urls, lambda size: counted((Post, ArchivedPost), size)),
+    'groups': (group_urls, lambda size: digested(Group, 'slug', size)),
+    'profiles': (
+        profile_urls, lambda size: digested(User, 'username', size)
+    ),
+}
+
+
+def fingerprints(section, size):
+    _, fingerprint = SECTIONS[section]
+    return {f'{section}-{shard}.xml.gz': list(value)
+            for shard, value in fingerprint(size).items()}
+
+
+@contextmanager
+def replacing(path, mode='w', **kwargs):
+    """Файл, который целиком заменит path после успешной записи.
+
+    Временное имя уникально: параллельные сборки не пишут в один файл,
+    а читатель не увидит файл наполовину записанным.
+    """
+    fd, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, mode, **kwargs) as out:
+            yield out
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def write_shard(path, urls):
+    with replacing(path, 'wb') as raw, gzip.open(
+        raw, 'wt', encoding='utf-8'
+    ) as out:
+        out.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for location, lastmod in urls:
+            location = escape(settings.SITE_URL + location)
+            out.write(f'<url><loc>{location}</loc>')
+            if lastmod:
+                out.write(f'<lastmod>{lastmod.date().isoformat()}</lastmod>')
+            out.write('</url>\n')
+        out.write('</urlset>\n')
+
+
+def write_index(root, manifest):
+    with replacing(os.path.join(root, INDEX), encoding='utf-8') as out:
+        out.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex '
+            'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for name, entry in sorted(manifest.items()):
+            location = settings.SITE_URL + reverse(
+                'posts:sitemap_shard', args=[name]
+            )
+            out.write(
+                f'<sitemap><loc>{escape(location)}</loc>'
+                f'<lastmod>{entry["built"]}</lastmod></sitemap>\n'
+            )
+        out.write('</sitemapindex>\n')
+
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST), encoding='utf-8') as source:
+            return json.load(source)
+    except FileNotFoundError:
+        return {}
+
+
+def build(force=False):
+    """Перестраивает шарды, у которых изменился отпечаток.
+
+    Возвращает имена перестроенных шардов.
+    """
+    root, size = settings.SITEMAP_ROOT, settings.SITEMAP_SHARD_SIZE
+    os.makedirs(root, exist_ok=True)
+    old = load_manifest(root)
+    manifest = {}
+    rebuilt = []
+    for section, (urls, _) in SECTIONS.items():
+        for name, fingerprint in fingerprints(section, size).items():
+            entry = old.get(name)
+            if force or not entry or entry['fingerprint'] != fingerprint:
+                shard = int(name[len(section) + 1:-len('.xml.gz')])
+                write_shard(
+                    os.path.join(root, name),
+                    urls(shard * size, (shard + 1) * size)
+                )
+                entry = {
+                    'fingerprint': fingerprint,
+                    'built': timezone.now().date().isoformat(),
+                }
+                rebuilt.append(name)
+            manifest[name] = entry
+    write_index(root, manifest)
+    manifest_path = os.path.join(root, MANIFEST)
+    with replacing(manifest_path, encoding='utf-8') as out:
+        json.dump(manifest, out)
+    for name in set(old) - set(manifest):
+        try:
+            os.remove(os.path.join(root, name))
+        except FileNotFoundError:
+            # Шард уже удалила параллельная сборка.
+            pass
+    return rebuilt
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from core.tasks import task
+
+from . import deletion, recommendations, sitemaps, thumbnails
+
+
+def queue_follow_refresh(user_id):
+    """Ставит пересчёт рекомендаций, если он ещё не ждёт в очереди.
+
+    Серия подписок подряд даёт одну задачу, а не задачу на каждую.
+    """
+    if caches['shared'].add(
+        recommendations.REFRESH_PENDING_KEY.format(user_id),
+        True,
+        settings.FOLLOW_REFRESH_PENDING_TIMEOUT
+    ):
+        refresh_follow_suggestions.delay(user_id)
+
+
+@task()
+def refresh_follow_suggestions(user_id):
+    # Флаг снимается до чтения подписок: изменение во время пересчёта
+    # поставит новую задачу.
+    caches['shared'].delete(
+        recommendations.REFRESH_PENDING_KEY.format(user_id)
+    )
+    recommendations.refresh_user(user_id)
+
+
+@task()
+def delete_user(user_id):
+    deletion.delete_user(user_id)
+
+
+@task()
+def delete_group(group_id):
+    deletion.delete_group(group_id)
+
+
+@task()
+def generate_thumbnail(post_id):
+    thumbnails.generate(post_id)
+
+
+@task()
+def build_sitemaps():
+    sitemaps.build()
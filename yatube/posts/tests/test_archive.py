@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR_COUNT=10)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='test-title',
+            slug='test-slug',
+            description='test-description'
+        )
+        for i in range(12):
+            Post.objects.create(
+                text=f'test-text{i}', author=cls.author, group=cls.group
+            )
+        cls.old_posts = list(Post.objects.order_by('pk')[:5])
+        for age, post in enumerate(reversed(cls.old_posts)):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=365 + age)
+            )
+        cls.comment = Comment.objects.create(
+            text='test-comment', author=cls.author, post=cls.old_posts[0]
+        )
+
+    def setUp(self):
+        cache.clear()
+        call_command('archive_posts', batch_size=2, pause=0, stdout=StringIO())
+
+    def test_old_posts_and_comments_are_moved(self):
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            {post.pk for post in self.old_posts}
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(
+            ArchivedComment.objects.filter(pk=self.comment.pk).exists()
+        )
+
+    def test_deep_pages_fall_back_to_archive(self):
+        """Лента продолжается архивными постами в прежнем порядке."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'test-author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).context['page_obj']
+                second = self.client.get(url + '?page=2').context['page_obj']
+                self.assertEqual(first.paginator.count, 12)
+                self.assertEqual(
+                    [post.text for post in list(first) + list(second)],
+                    [f'test-text{i}' for i in reversed(range(12))]
+                )
+
+    def test_post_detail_of_archived_post(self):
+        response = self.client.get(
+            reverse(
+                'posts:post_detail',
+                kwargs={'post_id': self.old_posts[0].pk}
+            )
+        )
+        self.assertEqual(response.context['post'].text, 'test-text0')
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            ['test-comment']
+        )
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.admin import ACTION_CHECKBOX_NAME
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import ChangeEvent
+from posts import bulk
+from posts.models import Comment, Follow, Group, Post, PostMonthCount
+
+User = get_user_model()
+
+
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+        cls.reader = User.objects.create_user(username='test-reader')
+        cls.group = Group.objects.create(
+            title='test-title', slug='test-slug', description='test'
+        )
+        cls.target = Group.objects.create(
+            title='target-title', slug='target-slug', description='test'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'test-text{i}', author=cls.author, group=cls.group
+            )
+            for i in range(5)
+        ]
+
+    def group_count(self, group):
+        return PostMonthCount.objects.filter(
+            scope=f'group:{group.pk}'
+        ).values_list('count', flat=True).first()
+
+    def test_move_posts_in_batches(self):
+        moved = bulk.move_posts(Post.objects.all(), self.target, 2)
+        self.assertEqual(moved, 5)
+        self.assertEqual(Post.objects.filter(group=self.target).count(), 5)
+        self.assertEqual(self.group_count(self.target), 5)
+        self.assertIsNone(self.group_count(self.group))
+        self.assertEqual(
+            bulk.move_posts(Post.objects.all(), self.target), 0
+        )
+
+    def test_delete_comments_with_replies(self):
+        post = self.posts[0]
+        spam = Comment.objects.create(
+            text='spam', author=self.reader, post=post
+        )
+        Comment.objects.create(
+            text='reply', author=self.author, post=post, parent=spam
+        )
+        kept = Comment.objects.create(
+            text='kept', author=self.author, post=post
+        )
+        deleted = bulk.delete_comments(
+            Comment.objects.filter(author=self.reader)
+        )
+        self.assertEqual(deleted, 2)
+        self.assertEqual(list(Comment.objects.all()), [kept])
+        self.assertEqual(
+            ChangeEvent.objects.filter(
+                model='posts.comment', action=ChangeEvent.DELETE
+            ).count(),
+            2
+        )
+
+    def test_reply_added_before_delete_is_removed(self):
+        """Ответ, появившийся до транзакции удаления, не остаётся сиротой."""
+        post = self.posts[0]
+        spam = Comment.objects.create(
+            text='spam', author=self.reader, post=post
+        )
+
+        @contextmanager
+        def reply_then_atomic():
+            Comment.objects.create(
+                text='late', author=self.author, post=post, parent=spam
+            )
+            with transaction.atomic():
+                yield
+
+        with mock.patch(
+            'posts.bulk.transaction', SimpleNamespace(atomic=reply_then_atomic)
+        ):
+            deleted = bulk.delete_comments(Comment.objects.filter(pk=spam.pk))
+        self.assertEqual(deleted, 2)
+        self.assertFalse(Comment.objects.filter(post=post).exists())
+
+    def test_delete_follows(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(bulk.delete_follows(Follow.objects.all()), 1)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_admin_action_moves_selection(self):
+        admin = User.objects.create_superuser(
+            'test-admin', 'admin@example.com', 'test-password'
+        )
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'action': 'move_to_group',
+                'group': self.target.pk,
+                ACTION_CHECKBOX_NAME: [self.posts[0].pk, self.posts[1].pk],
+            },
+            follow=True
+        )
+        self.assertContains(response, 'Перенесено постов: 2.')
+        self.assertEqual(Post.objects.filter(group=self.target).count(), 2)
@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+
+from core.models import Task
+from core.tasks import run_next
+from posts import tasks
+from posts.deletion import delete_posts_in_batches
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BatchDeletionTests(TransactionTestCase):
+    """Без общей транзакции теста: проверяются коммиты каждой пачки."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='test-author')
+        self.reader = User.objects.create_user(username='test-reader')
+        self.group = Group.objects.create(
+            title='test-title',
+            slug='test-slug',
+            description='test-description'
+        )
+        self.posts = [
+            Post.objects.create(
+                text=f'test-text{i}', author=self.author, group=self.group
+            )
+            for i in range(5)
+        ]
+        self.reader_post = Post.objects.create(
+            text='test-reader_text', author=self.reader, group=self.group
+        )
+        self.image_post = Post.objects.create(
+            text='test-image',
+            author=self.author,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        )
+        Comment.objects.create(
+            text='test-comment', author=self.reader, post=self.posts[0]
+        )
+        Comment.objects.create(
+            text='test-own', author=self.author, post=self.reader_post
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_delete_user_in_batches(self):
+        image_name = self.image_post.image.name
+        self.assertTrue(default_storage.exists(image_name))
+        out = StringIO()
+        call_command(
+            'batch_delete', user='test-author', batch_size=2, stdout=out
+        )
+        self.assertFalse(User.objects.filter(username='test-author').exists())
+        self.assertEqual(list(Post.objects.all()), [self.reader_post])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(default_storage.exists(image_name))
+        self.assertIn('posts: 6', out.getvalue())
+
+    def test_delete_group_keeps_posts(self):
+        call_command(
+            'batch_delete', group='test-slug', batch_size=2, stdout=StringIO()
+        )
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertFalse(Post.objects.filter(group__isnull=False).exists())
+
+    def test_task_commits_each_batch(self):
+        """Задача удаления из очереди не держит одну общую транзакцию."""
+        # Миниатюры, поставленные при создании постов, здесь не нужны.
+        Task.objects.all().delete()
+        tasks.delete_user.delay(self.author.pk)
+        with mock.patch('posts.deletion.logger') as logger:
+            logger.info.side_effect = (
+                lambda *args: states.append(connection.in_atomic_block)
+            )
+            states = []
+            self.assertTrue(run_next('default'))
+        self.assertGreaterEqual(len(states), 5)
+        self.assertEqual(set(states), {False})
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+
+    def test_images_stay_when_deletion_rolls_back(self):
+        image_name = self.image_post.image.name
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            delete_posts_in_batches(
+                Post.objects.filter(pk=self.image_post.pk),
+                'posts', 10, lambda label, done: None
+            )
+            raise RuntimeError
+        self.assertTrue(Post.objects.filter(pk=self.image_post.pk).exists())
+        self.assertTrue(default_storage.exists(image_name))
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from posts import follow_cache
+from posts.deletion import delete_in_batches
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowCacheTests(TransactionTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.user = User.objects.create_user(username='test-user')
+        self.author = User.objects.create_user(username='test-author')
+        self.other = User.objects.create_user(username='test-other')
+        Post.objects.create(text='test-text', author=self.author)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_cache_follows_writes(self):
+        """Подписка и отписка сбрасывают кеш, дальше чтения из кеша."""
+        self.assertFalse(
+            follow_cache.is_following(self.user.pk, self.author.pk)
+        )
+        self.assertEqual(follow_cache.followers_count(self.author.pk), 0)
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=self.user, author=self.other)
+        with self.assertNumQueries(1):
+            follow_cache.following_ids(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follow_cache.is_following(self.user.pk, self.author.pk)
+            )
+            self.assertEqual(
+                list(follow_cache.following_ids(self.user.pk)),
+                sorted([self.author.pk, self.other.pk])
+            )
+        self.assertEqual(follow_cache.followers_count(self.author.pk), 1)
+
+        Follow.objects.filter(user=self.user, author=self.author).delete()
+        self.assertFalse(
+            follow_cache.is_following(self.user.pk, self.author.pk)
+        )
+
+    def test_read_racing_with_follow_is_not_cached(self):
+        """Прочитанное до коммита подписки не попадает в кеш."""
+        load = follow_cache.load_following
+
+        def load_then_follow(user_id):
+            stale = load(user_id)
+            Follow.objects.create(user=self.user, author=self.author)
+            return stale
+
+        with mock.patch(
+            'posts.follow_cache.load_following', load_then_follow
+        ):
+            self.assertFalse(
+                follow_cache.is_following(self.user.pk, self.author.pk)
+            )
+        self.assertTrue(
+            follow_cache.is_following(self.user.pk, self.author.pk)
+        )
+
+    def test_follow_feed_uses_cached_authors(self):
+        self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'test-author'})
+        )
+        self.client.get(reverse('posts:follow_index'))
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+        profile = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'test-author'})
+        )
+        self.assertTrue(profile.context['following'])
+        self.assertEqual(profile.context['followers_count'], 1)
+
+    def test_follow_ignores_stale_cache(self):
+        """Решение о записи не принимается по кешу другого воркера."""
+        caches['shared'].set(
+            follow_cache.versioned(follow_cache.FOLLOWING_KEY, self.user.pk),
+            follow_cache.array('q', [self.author.pk])
+        )
+        self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'test-author'})
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+
+    def test_raw_batch_delete_forgets_cache(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertTrue(
+            follow_cache.is_following(self.user.pk, self.author.pk)
+        )
+        delete_in_batches(
+            Follow.objects.all(), 'follows', 10, lambda *args: None, raw=True
+        )
+        self.assertFalse(
+            follow_cache.is_following(self.user.pk, self.author.pk)
+        )
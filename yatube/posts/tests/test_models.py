@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import EXCERPT_LENGTH, Group, Post, make_excerpt
 
 User = get_user_model()
 
@@ -27,3 +27,22 @@ class PostModelTest(TestCase):
         post = PostModelTest.post
         self.assertEqual(str(group), group.title)
         self.assertEqual(str(post), post.text[:15])
+
+    def test_excerpt_is_maintained_on_save(self):
+        """Отрывок пересчитывается при каждом сохранении поста."""
+        post = Post.objects.create(author=self.user, text='слово ' * 100)
+        self.assertTrue(post.has_more)
+        self.assertLessEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(post.text.startswith(post.excerpt[:-1]))
+        self.assertTrue(post.excerpt.endswith('слово…'))
+
+        post.text = 'Короткий текст'
+        post.save()
+        self.assertFalse(post.has_more)
+        self.assertEqual(post.excerpt, post.text)
+
+    def test_excerpt_is_cut_on_word_boundary(self):
+        text = 'начало ' + 'длинноеслово ' * 30
+        excerpt = make_excerpt(text, 40)
+        self.assertEqual(excerpt, 'начало длинноеслово длинноеслово…')
+        self.assertEqual(make_excerpt('x' * 50, 10), 'x' * 9 + '…')
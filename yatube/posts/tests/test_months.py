@@ -0,0 +1,122 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import changes
+from posts import months
+from posts.models import Group, Post, PostMonthCount
+
+User = get_user_model()
+
+
+class MonthCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='test-title', slug='test-slug', description='test'
+        )
+        cls.other_group = Group.objects.create(
+            title='other-title', slug='other-slug', description='test'
+        )
+
+    def counts(self):
+        return dict(PostMonthCount.objects.values_list('scope', 'count'))
+
+    def test_counts_follow_create_edit_and_delete(self):
+        post = Post.objects.create(
+            text='test-text', author=self.author, group=self.group
+        )
+        Post.objects.create(text='other-text', author=self.author)
+        author, group = f'author:{self.author.pk}', f'group:{self.group.pk}'
+        self.assertEqual(
+            self.counts(), {'all': 2, author: 2, group: 1}
+        )
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(
+            self.counts(),
+            {'all': 2, author: 2, f'group:{self.other_group.pk}': 1}
+        )
+        post.delete()
+        self.assertEqual(self.counts(), {'all': 1, author: 1})
+
+    def test_archiving_keeps_counts(self):
+        Post.objects.create(text='test-text', author=self.author)
+        Post.objects.update(
+            pub_date=timezone.now() - datetime.timedelta(days=365)
+        )
+        before = self.counts()
+        call_command('archive_posts', pause=0, stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self.counts(), before)
+
+    def test_delete_with_muted_change_log_updates_counts(self):
+        """Заглушённый журнал изменений не означает перенос в архив."""
+        post = Post.objects.create(text='test-text', author=self.author)
+        with changes.muted():
+            post.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_rebuild_matches_incremental_counts(self):
+        for group in (self.group, None, self.group):
+            Post.objects.create(
+                text='test-text', author=self.author, group=group
+            )
+        before = self.counts()
+        months.rebuild()
+        self.assertEqual(self.counts(), before)
+
+
+class MonthArchiveViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='test-title', slug='test-slug', description='test'
+        )
+        for day in (5, 40):
+            post = Post.objects.create(
+                text=f'day-{day}', author=cls.author, group=cls.group
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.make_aware(datetime.datetime(2021, 1, 1))
+                + datetime.timedelta(days=day)
+            )
+        months.rebuild()
+
+    def test_calendar_comes_from_counts(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:archive'))
+        calendar = response.context['calendar']
+        self.assertEqual(
+            [(row['month'].month, row['count']) for row in calendar[0][1]],
+            [(2, 1), (1, 1)]
+        )
+
+    def test_month_pages_list_posts_of_the_month(self):
+        urls = (
+            reverse('posts:month_archive', args=(2021, 2)),
+            reverse('posts:group_month_archive', args=('test-slug', 2021, 2)),
+            reverse(
+                'posts:profile_month_archive', args=('test-author', 2021, 2)
+            ),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(
+                    [post.text for post in response.context['page_obj']],
+                    ['day-40']
+                )
+
+    def test_invalid_month_is_404(self):
+        response = self.client.get(
+            reverse('posts:month_archive', args=(2021, 13))
+        )
+        self.assertEqual(response.status_code, 404)
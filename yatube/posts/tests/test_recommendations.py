@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+
+from core.models import Task
+from posts import tasks
+from posts.models import Follow, FollowSuggestion
+from posts.recommendations import (POPULAR_CACHE_KEY, build_all, load_graph,
+                                   refresh_user, suggestions_for)
+
+User = get_user_model()
+
+
+class FollowSuggestionsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.alice, cls.bob, cls.carol, cls.dave, cls.erin = [
+            User.objects.create_user(username=name)
+            for name in ('alice', 'bob', 'carol', 'dave', 'erin')
+        ]
+        for user, author in (
+            (cls.alice, cls.bob),
+            (cls.alice, cls.carol),
+            (cls.bob, cls.dave),
+            (cls.carol, cls.dave),
+            (cls.carol, cls.erin),
+            (cls.bob, cls.alice),
+        ):
+            Follow.objects.create(user=user, author=author)
+
+    def setUp(self):
+        caches['shared'].clear()
+
+    def test_friends_of_friends_ranked_by_mutual_follows(self):
+        build_all(count=2)
+        self.assertEqual(
+            suggestions_for(self.alice, 2), [self.dave, self.erin]
+        )
+
+    def test_popular_authors_fill_empty_neighbourhood(self):
+        build_all(count=1)
+        self.assertEqual(suggestions_for(self.erin), [self.dave])
+
+    def test_incremental_refresh_matches_batch(self):
+        """Пересчёт одного пользователя совпадает с пакетным."""
+        build_all(count=3)
+        batch = list(
+            FollowSuggestion.objects.filter(user=self.bob)
+            .values_list('author_id', 'score')
+        )
+        refresh_user(self.bob.pk, count=3)
+        incremental = list(
+            FollowSuggestion.objects.filter(user=self.bob)
+            .values_list('author_id', 'score')
+        )
+        self.assertEqual(incremental, batch)
+
+    def test_follow_removes_suggestion(self):
+        build_all(count=2)
+        Follow.objects.create(user=self.alice, author=self.dave)
+        self.assertNotIn(self.dave, suggestions_for(self.alice))
+
+    def test_users_created_after_graph_load_get_popular_authors(self):
+        graph = load_graph()
+        newcomer = User.objects.create_user(username='newcomer')
+        with mock.patch(
+            'posts.recommendations.load_graph', return_value=graph
+        ):
+            build_all(count=1)
+        self.assertEqual(suggestions_for(newcomer), [self.dave])
+
+    def test_popular_authors_are_shared_between_workers(self):
+        build_all(count=1)
+        self.assertEqual(
+            caches['shared'].get(POPULAR_CACHE_KEY)[0], self.dave.pk
+        )
+
+    def test_graph_covers_users_created_during_load(self):
+        """Подписки пользователя новее максимального pk не ломают граф."""
+        newcomer = User.objects.create_user(username='newcomer')
+        Follow.objects.create(user=newcomer, author=self.bob)
+        stale = mock.MagicMock()
+        stale.objects.order_by.return_value.values_list.return_value \
+            .first.return_value = self.erin.pk
+        with mock.patch('posts.recommendations.User', stale):
+            indptr, authors, popularity = load_graph()
+        self.assertEqual(
+            authors[indptr[newcomer.pk]:indptr[newcomer.pk + 1]].tolist(),
+            [self.bob.pk]
+        )
+        self.assertEqual(popularity[self.bob.pk], 2)
+
+    def test_refreshes_are_coalesced_until_task_runs(self):
+        Task.objects.all().delete()
+        for _ in range(3):
+            tasks.queue_follow_refresh(self.alice.pk)
+        self.assertEqual(Task.objects.count(), 1)
+        tasks.refresh_follow_suggestions(self.alice.pk)
+        tasks.queue_follow_refresh(self.alice.pk)
+        self.assertEqual(Task.objects.count(), 2)
@@ -0,0 +1,104 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Task
+from posts.models import Group, Post
+from posts.sitemaps import build
+
+User = get_user_model()
+SITEMAP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SITEMAP_ROOT=SITEMAP_ROOT, SITEMAP_SHARD_SIZE=3)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test-author')
+        Group.objects.create(
+            title='test-title',
+            slug='test-slug',
+            description='test-description'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        self.posts = [
+            Post.objects.create(text=f'test-text{i}', author=self.author)
+            for i in range(7)
+        ]
+
+    def read_shard(self, name):
+        with gzip.open(os.path.join(SITEMAP_ROOT, name), 'rt') as source:
+            return source.read()
+
+    def test_only_changed_shards_are_rebuilt(self):
+        """Перестраиваются только шарды с изменившимися постами."""
+        first = build()
+        self.assertEqual(
+            len([name for name in first if name.startswith('posts-')]),
+            len({post.pk // 3 for post in self.posts})
+        )
+        self.assertEqual(build(), [])
+
+        deleted = self.posts[0]
+        deleted_pk = deleted.pk
+        deleted.delete()
+        self.assertEqual(build(), [f'posts-{deleted_pk // 3}.xml.gz'])
+        urls = ''.join(
+            self.read_shard(name)
+            for name in os.listdir(SITEMAP_ROOT) if name.startswith('posts-')
+        )
+        for post in self.posts[1:]:
+            self.assertIn(
+                reverse('posts:post_detail', args=[post.pk]), urls
+            )
+        self.assertNotIn(
+            reverse('posts:post_detail', args=[deleted_pk]) + '<', urls
+        )
+
+    def test_renamed_profile_rebuilds_its_shard(self):
+        """Переименование меняет отпечаток шарда без новых строк."""
+        build()
+        self.author.username = 'renamed-author'
+        self.author.save()
+        name = f'profiles-{self.author.pk // 3}.xml.gz'
+        self.assertEqual(build(), [name])
+        self.assertIn(
+            reverse('posts:profile', args=['renamed-author']),
+            self.read_shard(name)
+        )
+
+    def test_missing_index_is_not_built_by_request(self):
+        """Без индекса — 404 и одна задача сборки, файлы не пишутся."""
+        for _ in range(2):
+            response = self.client.get(reverse('posts:sitemap'))
+            self.assertEqual(response.status_code, 404)
+        self.assertFalse(os.path.exists(SITEMAP_ROOT))
+        self.assertEqual(
+            list(Task.objects.values_list('name', flat=True)),
+            ['posts.tasks.build_sitemaps']
+        )
+
+    def test_index_lists_all_sections(self):
+        build()
+        response = self.client.get(reverse('posts:sitemap'))
+        index = b''.join(response.streaming_content).decode()
+        self.assertIn('groups-', index)
+        self.assertIn('profiles-', index)
+        self.assertIn('posts-', index)
+        shard = self.client.get(
+            reverse('posts:sitemap_shard', args=['groups-0.xml.gz'])
+        )
+        self.assertEqual(shard.status_code, 200)
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import COMMENT_MAX_DEPTH, Comment, Post
+from posts.threads import subtree, thread_page
+
+User = get_user_model()
+
+
+class CommentThreadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+        cls.post = Post.objects.create(text='test-text', author=cls.author)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(
+            text=text, author=self.author, post=self.post, parent=parent
+        )
+
+    def test_tree_order_and_subtree(self):
+        first = self.comment('1')
+        second = self.comment('2')
+        reply = self.comment('1.1', parent=first)
+        self.comment('2.1', parent=second)
+        self.comment('1.1.1', parent=reply)
+        self.comment('1.2', parent=first)
+        comments = self.post.comments.order_by('path')
+        self.assertEqual(
+            [(c.text, c.depth) for c in comments],
+            [('1', 0), ('1.1', 1), ('1.1.1', 2), ('1.2', 1),
+             ('2', 0), ('2.1', 1)]
+        )
+        with self.assertNumQueries(1):
+            texts = [c.text for c in subtree(self.post.comments, first.path)]
+        self.assertEqual(texts, ['1', '1.1', '1.1.1', '1.2'])
+
+    def test_depth_is_limited(self):
+        parent = None
+        for level in range(COMMENT_MAX_DEPTH + 2):
+            parent = self.comment(str(level), parent=parent)
+        self.assertEqual(parent.depth, COMMENT_MAX_DEPTH)
+        self.assertEqual(
+            self.post.comments.filter(depth=COMMENT_MAX_DEPTH).count(), 2
+        )
+
+    @override_settings(COMMENT_THREADS_PER_PAGE=2, COMMENT_PAGE_LIMIT=100)
+    def test_page_contains_whole_threads(self):
+        roots = [self.comment(f'root{i}') for i in range(3)]
+        for root in roots:
+            self.comment(f'reply-{root.text}', parent=root)
+        with self.assertNumQueries(2):
+            page, comments = thread_page(self.post.comments.all(), 2)
+            texts = [c.text for c in comments]
+            authors = {c.author.username for c in comments}
+        self.assertEqual(page.paginator.num_pages, 2)
+        self.assertEqual(texts, ['root2', 'reply-root2'])
+        self.assertEqual(authors, {'test-author'})
+
+    @override_settings(COMMENT_THREADS_PER_PAGE=2, COMMENT_PAGE_LIMIT=5)
+    def test_limit_moves_threads_to_next_page(self):
+        """Ветка, не влезающая в лимит, уходит на следующую страницу.
+
+        Ни один комментарий не теряется, а ветка больше лимита
+        продолжается на следующих страницах.
+        """
+        sizes = {'root0': 3, 'root1': 4, 'root2': 1, 'root3': 12}
+        for text, size in sizes.items():
+            root = self.comment(text)
+            for i in range(size - 1):
+                self.comment(f'{text}-reply{i}', parent=root)
+        comments = self.post.comments.all()
+        pages = []
+        for number in range(1, 10):
+            page, rows = thread_page(comments, number)
+            if page.number != number:
+                break
+            pages.append([c.text for c in rows])
+        self.assertEqual(
+            [[text for text in texts if '-' not in text] for texts in pages],
+            [['root0'], ['root1', 'root2'], ['root3'], [], []]
+        )
+        self.assertEqual([len(texts) for texts in pages], [3, 5, 5, 5, 2])
+        self.assertEqual(
+            sorted(sum(pages, [])),
+            sorted(comments.values_list('text', flat=True))
+        )
+
+    def test_reply_through_view(self):
+        client = Client()
+        client.force_login(self.author)
+        root = self.comment('root')
+        client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'reply', 'parent': root.pk}
+        )
+        reply = Comment.objects.get(text='reply')
+        self.assertEqual(reply.parent, root)
+        self.assertEqual(reply.path, root.path + str(reply.pk).zfill(10))
+        response = client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(response.context['comments'], [root, reply])
+
+    def test_reply_to_other_post_is_rejected(self):
+        client = Client()
+        client.force_login(self.author)
+        other = Post.objects.create(text='other', author=self.author)
+        foreign = Comment.objects.create(
+            text='foreign', author=self.author, post=other
+        )
+        client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'reply', 'parent': foreign.pk}
+        )
+        self.assertFalse(Comment.objects.filter(text='reply').exists())
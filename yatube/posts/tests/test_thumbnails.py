@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Task
+from core.tasks import run_next
+from posts.models import Post
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def fake_thumbnail(image, geometry, **options):
+    return SimpleNamespace(
+        name=f'cache/{image.name}', width=960, height=339
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@mock.patch('posts.thumbnails.get_thumbnail', fake_thumbnail)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, name='small.gif'):
+        return Post.objects.create(
+            text='test-text',
+            author=self.author,
+            image=SimpleUploadedFile(name, SMALL_GIF, 'image/gif')
+        )
+
+    def test_thumbnail_is_built_in_background(self):
+        post = self.create_post()
+        post.refresh_from_db()
+        self.assertEqual(post.thumb, '')
+        run_next('default')
+        post.refresh_from_db()
+        self.assertEqual(post.thumb, f'cache/{post.image.name}')
+        self.assertEqual((post.thumb_width, post.thumb_height), (960, 339))
+
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response, f'src="{post.thumb_url}" width="960" height="339"'
+        )
+
+    def test_only_image_change_schedules_regeneration(self):
+        post = self.create_post()
+        run_next('default')
+        post.refresh_from_db()
+        Task.objects.all().delete()
+        post.text = 'new-text'
+        post.save()
+        self.assertFalse(Task.objects.exists())
+        self.assertNotEqual(post.thumb, '')
+
+        post.image = SimpleUploadedFile('other.gif', SMALL_GIF, 'image/gif')
+        post.save()
+        self.assertEqual(Task.objects.count(), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.thumb, '')
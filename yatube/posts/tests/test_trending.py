@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Post
+from posts.trending import activity_score, combine
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test-author')
+        cls.old_post = Post.objects.create(text='old', author=cls.author)
+        cls.new_post = Post.objects.create(text='new', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_scores_decay_with_age(self):
+        now = timezone.now()
+        self.assertGreater(
+            activity_score(1, now),
+            activity_score(1, now - timedelta(days=1))
+        )
+        self.assertAlmostEqual(
+            combine(activity_score(1, now), activity_score(1, now)),
+            activity_score(2, now)
+        )
+
+    def test_comment_moves_post_up(self):
+        """Комментарий поднимает пост в популярном."""
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['page_obj'][0], self.new_post)
+
+        Comment.objects.create(
+            text='comment', author=self.author, post=self.old_post
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['page_obj'][0], self.old_post)
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import view_counter
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+        cls.post = Post.objects.create(text='test-text', author=cls.author)
+        cls.other = Post.objects.create(text='other-text', author=cls.author)
+
+    def setUp(self):
+        view_counter.pending.clear()
+        self.url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_views_are_buffered_until_flush(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['views'], 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+
+        self.assertEqual(view_counter.flush(), 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+        self.assertGreater(self.post.trend_score, 0)
+        self.assertEqual(view_counter.live_views(self.post), 2)
+
+    def test_flush_batches_equal_increments(self):
+        for post in (self.post, self.other):
+            view_counter.hit(post.pk)
+        with self.assertNumQueries(4):
+            view_counter.write(dict(view_counter.pending))
+        self.assertEqual(
+            list(Post.objects.order_by('pk').values_list('views', flat=True)),
+            [1, 1]
+        )
+
+    def test_failed_flush_keeps_views(self):
+        view_counter.hit(self.post.pk)
+        with mock.patch.object(
+            view_counter, 'write', side_effect=OperationalError
+        ):
+            with self.assertRaises(OperationalError):
+                view_counter.flush()
+        self.assertEqual(view_counter.pending[self.post.pk], 1)
@@ -3,7 +3,7 @@ import tempfile
 
 from django import forms
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
@@ -77,6 +77,7 @@ class PostPagesTests(TestCase):
         self.another_author_client.force_login(self.another_author)
 
         cache.clear()
+        caches['shared'].clear()
 
     @classmethod
     def tearDownClass(cls):
@@ -134,6 +135,18 @@ class PostPagesTests(TestCase):
                 f'posts/{PostPagesTests.image_name}'
             )
 
+    def test_feeds_do_not_load_full_text(self):
+        """Ленты загружают только отрывки постов."""
+        long_post = Post.objects.create(
+            text='слово ' * 100,
+            author=self.author
+        )
+        response = self.author_client.get(reverse('posts:index'))
+        first_object = response.context['page_obj'][0]
+        self.assertIn('text', first_object.get_deferred_fields())
+        self.assertContains(response, long_post.excerpt)
+        self.assertNotContains(response, long_post.text)
+
     def test_follow_index_page_show_correct_context(self):
         follow_text = 'test-follow_text'
         Post.objects.create(
@@ -280,11 +293,11 @@ class PostPagesTests(TestCase):
         Post.objects.filter(pk=post.pk).delete()
         response = self.client.get(reverse('posts:index'))
         last_post = response.context['page_obj'][0]
-        self.assertEqual(last_post.text, cache_text)
+        self.assertEqual(last_post.excerpt, cache_text)
         cache.clear()
         response = self.client.get(reverse('posts:index'))
         last_post = response.context['page_obj'][0]
-        self.assertNotEqual(last_post.text, cache_text)
+        self.assertNotEqual(last_post.excerpt, cache_text)
 
     def test_follow_authorized_user(self):
         follows_before = Follow.objects.filter(user=self.author).count()
@@ -0,0 +1,78 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+COMMAND = 'posts.management.commands.warm_caches'
+
+
+class FakeResponse:
+    status = 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def read(self):
+        return b''
+
+
+class WarmCachesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='test-author')
+        cls.quiet = User.objects.create_user(username='quiet-author')
+        cls.group = Group.objects.create(
+            title='test-title', slug='test-slug', description='test'
+        )
+        for i in range(3):
+            Post.objects.create(
+                text=f'test-text{i}', author=cls.author, group=cls.group
+            )
+        Post.objects.create(text='quiet-text', author=cls.quiet)
+        cls.with_image = Post.objects.create(
+            text='image-text', author=cls.author, group=cls.group
+        )
+        Post.objects.filter(pk=cls.with_image.pk).update(
+            image='posts/small.gif'
+        )
+
+    def run_command(self, urlopen, **options):
+        out = StringIO()
+        with mock.patch(f'{COMMAND}.urlopen', urlopen) as opened, \
+                mock.patch(f'{COMMAND}.generate') as generate:
+            call_command(
+                'warm_caches', base_url='http://testserver/', pages=2,
+                groups=1, profiles=1, stdout=out, **options
+            )
+        return out.getvalue(), opened, generate
+
+    def test_warms_top_pages_and_their_thumbnails(self):
+        output, opened, generate = self.run_command(
+            mock.Mock(return_value=FakeResponse())
+        )
+        generate.assert_called_once_with(self.with_image.pk)
+        self.assertEqual(
+            sorted(call.args[0] for call in opened.call_args_list),
+            [
+                'http://testserver/?page=1',
+                'http://testserver/?page=2',
+                'http://testserver/group/test-slug/',
+                'http://testserver/profile/test-author/',
+            ]
+        )
+        self.assertIn('Страниц: 4, ошибок: 0', output)
+
+    def test_failed_pages_fail_the_command(self):
+        with self.assertRaises(CommandError):
+            self.run_command(
+                mock.Mock(side_effect=OSError('connection refused'))
+            )
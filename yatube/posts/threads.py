@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.db.models.functions import Substr
+
+from .models import COMMENT_PATH_STEP
+
+# Следующий за цифрами символ: все пути, начинающиеся с path,
+# лежат в диапазоне [path, path + PATH_END).
+PATH_END = ':'
+
+
+def subtree(comments, path):
+    """Комментарий с путём path и все ответы на него, в порядке дерева."""
+    return comments.filter(
+        path__gte=path, path__lt=path + PATH_END
+    ).order_by('path')
+
+
+def thread_sizes(comments):
+    """[(путь корня, число комментариев в его ветке)] в порядке дерева."""
+    # Строка на корень, а не на комментарий: отсортировать их в Python
+    # дешевле, чем строить для ORDER BY вторую временную B-tree.
+    return sorted(comments.annotate(
+        root=Substr('path', 1, COMMENT_PATH_STEP)
+    ).values('root').annotate(size=Count('id')).order_by().values_list(
+        'root', 'size'
+    ))
+
+
+def page_ranges(sizes):
+    """Раскладывает ветки по страницам.
+
+    На странице не больше COMMENT_THREADS_PER_PAGE веток и не больше
+    COMMENT_PAGE_LIMIT комментариев: ветка, которая не помещается,
+    целиком переносится на следующую страницу. Ветка больше лимита
+    занимает несколько страниц подряд.
+    Возвращает [(путь первого корня, путь последнего, сдвиг)].
+    """
+    limit = settings.COMMENT_PAGE_LIMIT
+    pages, roots, total = [], [], 0
+    for root, size in sizes:
+        if roots and (
+            len(roots) == settings.COMMENT_THREADS_PER_PAGE
+            or total + size > limit
+        ):
+            pages.append((roots[0], roots[-1], 0))
+            roots, total = [], 0
+        if size > limit:
+            pages += [(root, root, offset) for offset in range(0, size, limit)]
+        else:
+            roots.append(root)
+            total += size
+    if roots:
+        pages.append((roots[0], roots[-1], 0))
+    return pages
+
+
+def thread_page(comments, page_number):
+    """Страница веток обсуждения поста.
+
+    Страницы собираются по размерам веток (page_ranges), а комментарии
+    страницы читаются одним запросом по диапазону путей от первого
+    корня до конца последнего. Глубина ограничена COMMENT_MAX_DEPTH.
+    Возвращает страницу и список комментариев для вывода.
+    """
+    page = Paginator(page_ranges(thread_sizes(comments)), 1).get_page(
+        page_number
+    )
+    if not page.object_list:
+        return page, []
+    first, last, offset = page.object_list[0]
+    rows = comments.filter(
+        path__gte=first, path__lt=last + PATH_END
+    ).select_related('author').order_by('path')
+    return page, list(rows[offset:offset + settings.COMMENT_PAGE_LIMIT])
@@ -0,0 +1,92 @@
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post
+
+TRENDING_CACHE_KEY = 'trending_top'
+EPOCH = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def activity_score(weight, moment=None):
+    """Логарифм веса события, приведённый к общей эпохе.
+
+    Вес события, случившегося в момент t, затухает как
+    exp(-(now - t) / tau). Если хранить сумму весов, умноженных на
+    exp((t - EPOCH) / tau), то затухание не надо пересчитывать:
+    множитель exp(-(now - EPOCH) / tau) общий для всех постов и не
+    меняет их порядок. Храним логарифм, чтобы не переполнить float.
+    """
+    moment = moment or timezone.now()
+    tau = settings.TRENDING_HALF_LIFE / math.log(2)
+    return math.log(weight) + (moment - EPOCH).total_seconds() / tau
+
+
+def combine(first, second):
+    """log(exp(first) + exp(second)) без переполнения."""
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+def bump(post_id, weight):
+    """Учитывает новое событие у поста и обновляет топ в кеше."""
+    bump_many({post_id: weight})
+
+
+def bump_many(weights):
+    """То же для нескольких постов сразу: {post_id: вес события}."""
+    with transaction.atomic():
+        current = Post.objects.filter(pk__in=list(weights)).values_list(
+            'pk', 'trend_score'
+        )
+        scores = {
+            pk: combine(score, activity_score(weights[pk]))
+            for pk, score in current
+        }
+        for pk, score in scores.items():
+            Post.objects.filter(pk=pk).update(trend_score=score)
+    for pk, score in scores.items():
+        remember(pk, score)
+
+
+def load_top():
+    return [
+        [score, pk] for score, pk in Post.objects.order_by(
+            '-trend_score'
+        ).values_list('trend_score', 'pk')[:settings.TRENDING_SIZE]
+    ]
+
+
+def top_ids():
+    """Id постов топа по убыванию популярности."""
+    top = cache.get(TRENDING_CACHE_KEY)
+    if top is None:
+        top = load_top()
+        cache.set(
+            TRENDING_CACHE_KEY, top, settings.TRENDING_CACHE_TIMEOUT
+        )
+    return [pk for _, pk in top]
+
+
+def remember(post_id, score):
+    """Вставляет пост в ограниченный топ, не обращаясь к базе.
+
+    Топ кешируется в каждом процессе отдельно и перечитывается из
+    индекса по trend_score раз в TRENDING_CACHE_TIMEOUT секунд, так что
+    события из других процессов появляются в нём с этой задержкой.
+    """
+    top = cache.get(TRENDING_CACHE_KEY)
+    if top is None:
+        return
+    top = [entry for entry in top if entry[1] != post_id]
+    top.append([score, post_id])
+    top.sort(reverse=True)
+    cache.set(
+        TRENDING_CACHE_KEY,
+        top[:settings.TRENDING_SIZE],
+        settings.TRENDING_CACHE_TIMEOUT
+    )
@@ -0,0 +1,126 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F
+
+from core.db import atomic_retry
+
+from . import trending
+from .models import ArchivedPost, Post
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+lock = threading.Lock()
+pending = Counter()
+state = {'enabled': False, 'pid': None}
+
+
+def hit(post_id):
+    """Учитывает просмотр поста в памяти процесса, без записи в базу."""
+    with lock:
+        pending[post_id] += 1
+    if state['enabled'] and state['pid'] != os.getpid():
+        start_flusher()
+
+
+def live_views(post):
+    """Просмотры из базы плюс ещё не сохранённые просмотры процесса.
+
+    Несохранённые просмотры других процессов видны только после их
+    сброса, поэтому число приблизительное.
+    """
+    with lock:
+        return post.views + pending.get(post.pk, 0)
+
+
+@atomic_retry
+def write(counts):
+    """Прибавляет просмотры одним UPDATE на каждое значение прироста.
+
+    Постов с одинаковым приростом за интервал обычно много, поэтому
+    запросов выходит мало, и все они идут в одной транзакции.
+    """
+    by_increment = defaultdict(list)
+    for post_id, count in counts.items():
+        by_increment[count].append(post_id)
+    for count, ids in by_increment.items():
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            for model in (Post, ArchivedPost):
+                model.objects.filter(pk__in=chunk).update(
+                    views=F('views') + count
+                )
+
+
+def flush():
+    """Сохраняет накопленные просмотры; возвращает их число.
+
+    Если запись не удалась, просмотры возвращаются в буфер и уйдут со
+    следующим сбросом.
+    """
+    with lock:
+        counts = dict(pending)
+        pending.clear()
+    if not counts:
+        return 0
+    try:
+        write(counts)
+    except DatabaseError:
+        with lock:
+            pending.update(counts)
+        raise
+    weight = settings.TRENDING_WEIGHTS['view']
+    trending.bump_many(
+        {post_id: count * weight for post_id, count in counts.items()}
+    )
+    return sum(counts.values())
+
+
+def flush_quietly():
+    close_old_connections()
+    try:
+        flush()
+    except Exception:
+        logger.exception('Не удалось сохранить просмотры постов')
+
+
+def run(interval):
+    while True:
+        time.sleep(interval)
+        flush_quietly()
+
+
+def start_flusher():
+    with lock:
+        if state['pid'] == os.getpid():
+            return
+        state['pid'] = os.getpid()
+    threading.Thread(
+        target=run,
+        args=(settings.VIEW_FLUSH_INTERVAL,),
+        name='view-counter',
+        daemon=True
+    ).start()
+
+
+def enable():
+    """Включает периодический сброс просмотров в процессах сервера.
+
+    Поток сброса запускается при первом просмотре в каждом процессе,
+    так что переживает fork воркеров после загрузки приложения. При
+    штатной остановке процесса остаток сохраняется через atexit; при
+    аварийной теряется не больше VIEW_FLUSH_INTERVAL секунд просмотров
+    этого процесса.
+    """
+    if state['enabled']:
+        return
+    state['enabled'] = True
+    atexit.register(flush_quietly)
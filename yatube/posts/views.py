@@ -1,20 +1,38 @@
+import os
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
 
+from core.db import atomic_retry
+from core.ratelimit import ratelimit
 from yatube.settings import PAGINATOR_COUNT
 
+from . import follow_cache, months, sitemaps, tasks, view_counter
+from .archive import ChainedFeed, find_post
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
+from .models import ArchivedPost, Follow, Group, Post, User
+from .recommendations import suggestions_for
+from .threads import thread_page
+from .trending import top_ids
+
+
+def feed(queryset):
+    """Посты для лент: без полного текста, с автором и группой."""
+    return queryset.select_related('author', 'group').defer('text')
 
 
 def index(request):
     template = 'posts/index.html'
     post_list = cache.get('index_page')
     if not post_list:
-        post_list = Post.objects.all()
+        post_list = feed(Post.objects.all())
         cache.set('index_page', post_list, timeout=20)
+    post_list = ChainedFeed(post_list, feed(ArchivedPost.objects.all()))
     paginator = Paginator(post_list, PAGINATOR_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -24,11 +42,31 @@ def index(request):
     return render(request, template, context)
 
 
+def trending(request):
+    template = 'posts/trending.html'
+    paginator = Paginator(top_ids(), PAGINATOR_COUNT)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    posts = feed(Post.objects.all()).in_bulk(
+        page_obj.object_list
+    )
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    context = {
+        'page_obj': page_obj,
+        'trending': True,
+    }
+    return render(request, template, context)
+
+
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
 
-    post_list = Post.objects.filter(group=group)
+    post_list = ChainedFeed(
+        feed(Post.objects.filter(group=group)),
+        feed(ArchivedPost.objects.filter(group=group))
+    )
     paginator = Paginator(post_list, PAGINATOR_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -45,12 +83,15 @@ def profile(request, username):
     profile = get_object_or_404(User, username=username)
 
     if request.user.is_authenticated:
-        following = bool(
-            Follow.objects.filter(author=profile, user=request.user)
-        )
+        following = follow_cache.is_following(request.user.pk, profile.pk)
+        suggestions = suggestions_for(request.user)
     else:
         following = False
-    post_list = Post.objects.filter(author=profile)
+        suggestions = []
+    post_list = ChainedFeed(
+        feed(Post.objects.filter(author=profile)),
+        feed(ArchivedPost.objects.filter(author=profile))
+    )
     post_count = post_list.count()
     paginator = Paginator(post_list, PAGINATOR_COUNT)
     page_number = request.GET.get('page')
@@ -60,33 +101,93 @@ def profile(request, username):
         'profile': profile,
         'page_obj': page_obj,
         'post_count': post_count,
-        'following': following
+        'following': following,
+        'followers_count': follow_cache.followers_count(profile.pk),
+        'suggestions': suggestions,
     }
     return render(request, template, context)
 
 
+def archive_page(request, scope, filters, year, month, **context):
+    """Календарь ленты по месяцам и, если месяц выбран, его посты.
+
+    Календарь читается из помесячных счётчиков, а посты месяца — по
+    индексу на pub_date в пределах месяца.
+    """
+    template = 'posts/archive.html'
+    page_obj = None
+    if year is not None:
+        try:
+            start, end = months.month_range(year, month)
+        except (ValueError, OverflowError):
+            raise Http404
+        period = dict(filters, pub_date__gte=start, pub_date__lt=end)
+        post_list = ChainedFeed(
+            feed(Post.objects.filter(**period)),
+            feed(ArchivedPost.objects.filter(**period))
+        )
+        paginator = Paginator(post_list, PAGINATOR_COUNT)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        context['month'] = start
+    context.update({
+        'calendar': months.calendar(scope),
+        'page_obj': page_obj,
+    })
+    return render(request, template, context)
+
+
+def post_archive(request, year=None, month=None):
+    return archive_page(request, months.ALL, {}, year, month)
+
+
+def group_archive(request, slug, year=None, month=None):
+    group = get_object_or_404(Group, slug=slug)
+    return archive_page(
+        request, months.group_scope(group.pk), {'group': group},
+        year, month, group=group
+    )
+
+
+def profile_archive(request, username, year=None, month=None):
+    profile = get_object_or_404(User, username=username)
+    return archive_page(
+        request, months.author_scope(profile.pk), {'author': profile},
+        year, month, profile=profile
+    )
+
+
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    profile = get_object_or_404(User, username=post.author)
-    comments = Comment.objects.filter(post=post.pk)
-    posts_count = Post.objects.filter(author=profile).count()
+    post = find_post(post_id)
+    if post is None:
+        raise Http404
+    view_counter.hit(post.pk)
+    profile = post.author
+    comment_page, comments = thread_page(
+        post.comments.all(), request.GET.get('page')
+    )
+    posts_count = (
+        Post.objects.filter(author=profile).count()
+        + ArchivedPost.objects.filter(author=profile).count()
+    )
     form = CommentForm(
         request.POST or None,
         files=request.FILES or None
     )
     context = {
         'post': post,
+        'views': view_counter.live_views(post),
         'posts_count': posts_count,
         'profile': profile,
         'comments': comments,
+        'page_obj': comment_page,
         'form': form,
-
     }
     return render(request, template, context)
 
 
 @login_required
+@ratelimit('post_create', methods=('POST',))
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm(
@@ -134,9 +235,11 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('add_comment')
+@atomic_retry
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    form = CommentForm(request.POST or None)
+    form = CommentForm(request.POST or None, post=post)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -148,27 +251,28 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    following = Follow.objects.filter(user=request.user)
-    author_list = [obj.author for obj in following]
-    post_list = Post.objects.filter(author__in=author_list)
+    author_list = list(follow_cache.following_ids(request.user.pk))
+    post_list = ChainedFeed(
+        feed(Post.objects.filter(author_id__in=author_list)),
+        feed(ArchivedPost.objects.filter(author_id__in=author_list))
+    )
     paginator = Paginator(post_list, PAGINATOR_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
+        'suggestions': suggestions_for(request.user),
     }
     return render(request, template, context)
 
 
 @login_required
+@ratelimit('follow')
+@atomic_retry
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    follow_relation = Follow.objects.filter(
-        user=request.user.id,
-        author=author.id
-    ).count()
-    if not follow_relation and (request.user.id != author.id):
-        Follow.objects.create(
+    if request.user.id != author.id:
+        Follow.objects.get_or_create(
             user=request.user,
             author=author
         )
@@ -176,12 +280,28 @@ def profile_follow(request, username):
 
 
 @login_required
+@ratelimit('follow')
+@atomic_retry
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    follow_relation = Follow.objects.filter(
-        user=request.user.id,
-        author=author.id
-    ).count()
-    if follow_relation:
-        Follow.objects.filter(user=request.user, author=author).delete()
+    Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
+
+
+def sitemap_index(request):
+    path = os.path.join(settings.SITEMAP_ROOT, sitemaps.INDEX)
+    if not os.path.exists(path):
+        # Строит команда build_sitemaps или задача, но не сам запрос;
+        # ключ не даёт ставить сборку в очередь чаще раза в день.
+        tasks.build_sitemaps.delay(
+            idempotency_key=f'build_sitemaps:{timezone.now().date()}'
+        )
+        raise Http404
+    return FileResponse(open(path, 'rb'), content_type='application/xml')
+
+
+def sitemap_shard(request, name):
+    path = os.path.join(settings.SITEMAP_ROOT, os.path.basename(name))
+    if not name.endswith('.xml.gz') or not os.path.exists(path):
+        raise Http404
+    return FileResponse(open(path, 'rb'), content_type='application/gzip')
@@ -0,0 +1,25 @@
+from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts import tasks
+
+User = get_user_model()
+
+
+class BatchDeleteUserAdmin(UserAdmin):
+    actions = ('delete_in_background',)
+
+    def delete_in_background(self, request, queryset):
+        for user_id in queryset.values_list('pk', flat=True):
+            tasks.delete_user.delay(user_id)
+        self.message_user(
+            request,
+            'Удаление пользователей поставлено в очередь.',
+            messages.SUCCESS
+        )
+    delete_in_background.short_description = 'Удалить пачками в фоне'
+
+
+admin.site.unregister(User)
+admin.site.register(User, BatchDeleteUserAdmin)
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from core.bloom import BloomFilter
+
+User = get_user_model()
+
+FIELDS = ('username', 'email')
+# Счётчики в общем кеше: сколько раз пользователей создавали и сколько
+# раз меняли имя или почту либо удаляли пользователя. Так процесс
+# узнаёт об изменениях в других.
+CREATED_KEY = 'availability_created'
+CHANGED_KEY = 'availability_changed'
+
+lock = threading.Lock()
+filters = {}
+state = {'built': None, 'last_id': 0, 'created': 0, 'changed': 0}
+
+
+def normalize(field, value):
+    value = value.strip()
+    if field == 'email':
+        return User.objects.normalize_email(value)
+    return User.normalize_username(value)
+
+
+def versions():
+    """(создано, изменено) по счётчикам общего кеша."""
+    values = caches['shared'].get_many((CREATED_KEY, CHANGED_KEY))
+    return values.get(CREATED_KEY, 0), values.get(CHANGED_KEY, 0)
+
+
+def changed(created=False):
+    """Сообщает процессам о новом пользователе, смене имени или почты
+    либо удалении пользователя.
+
+    Вызывается после коммита: процесс, увидевший новый счётчик, должен
+    найти изменение в базе.
+    """
+    key = CREATED_KEY if created else CHANGED_KEY
+    shared = caches['shared']
+    shared.add(key, 0, None)
+    shared.incr(key)
+
+
+def add_rows(target, rows):
+    """Добавляет строки (id, username, email); возвращает наибольший id."""
+    last_id = 0
+    for pk, username, email in rows:
+        target['username'].add(username)
+        if email:
+            target['email'].add(email)
+        last_id = max(last_id, pk)
+    return last_id
+
+
+def build(current=None):
+    """Строит фильтры процесса по всем пользователям за один проход.
+
+    Ёмкость берётся с двукратным запасом, так что фильтр перестраивается,
+    когда пользователей станет вдвое больше, когда в каком-то процессе
+    сменят имя или почту, удалят пользователя или когда истечёт
+    AVAILABILITY_REBUILD_INTERVAL.
+    """
+    created, changed_count = current or versions()
+    capacity = max(
+        User.objects.count() * 2, settings.AVAILABILITY_MIN_CAPACITY
+    )
+    fresh = {
+        field: BloomFilter(capacity, settings.AVAILABILITY_ERROR_RATE)
+        for field in FIELDS
+    }
+    last_id = add_rows(
+        fresh, User.objects.values_list('pk', *FIELDS).iterator()
+    )
+    with lock:
+        filters.update(fresh)
+        state.update(
+            built=time.monotonic(),
+            last_id=last_id,
+            created=created,
+            changed=changed_count
+        )
+
+
+def catch_up(created):
+    """Добавляет пользователей, созданных после построения фильтров.
+
+    Новые id больше всех уже учтённых, поэтому запрос идёт по диапазону
+    первичного ключа.
+    """
+    with lock:
+        last_id = state['last_id']
+    rows = list(
+        User.objects.filter(pk__gt=last_id).values_list('pk', *FIELDS)
+    )
+    with lock:
+        state['last_id'] = max(state['last_id'], add_rows(filters, rows))
+        state['created'] = created
+
+
+def get_filter(field):
+    current = versions()
+    with lock:
+        built = state['built']
+        stale = built is None or filters[field].is_full or (
+            time.monotonic() - built > settings.AVAILABILITY_REBUILD_INTERVAL
+        ) or current[1] != state['changed']
+        behind = current[0] != state['created']
+    if stale:
+        build(current)
+    elif behind:
+        catch_up(current[0])
+    return filters[field]
+
+
+def remember(user):
+    """Добавляет нового пользователя в уже построенные фильтры процесса.
+
+    Другие процессы узнают о нём из счётчика, см. changed().
+    """
+    with lock:
+        if not filters:
+            return
+        filters['username'].add(user.username)
+        if user.email:
+            filters['email'].add(user.email)
+
+
+def is_taken(field, value):
+    """Занято ли значение поля username или email.
+
+    Фильтр отвечает «точно свободно» без обращения к базе; в базу, по
+    индексу, идут только его возможные попадания.
+    """
+    value = normalize(field, value)
+    if not value or value not in get_filter(field):
+        return False
+    return User.objects.filter(**{field: value}).exists()
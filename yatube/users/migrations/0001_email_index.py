@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Индекс для проверки занятости email при регистрации.
+
+    Таблица auth_user принадлежит django.contrib.auth, поэтому индекс
+    создаётся SQL-запросом, а не через модель.
+    """
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX users_auth_user_email_idx ON auth_user (email)',
+            'DROP INDEX users_auth_user_email_idx',
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import availability
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=User)
+def remember_old_identity(sender, instance, raw=False, update_fields=None,
+                          **kwargs):
+    """Проверяет, меняются ли имя или почта сохраняемого пользователя.
+
+    Фильтры процессов перестраиваются только после такой смены, а не
+    после любого save(), например при правке профиля или пароля.
+    """
+    instance._identity_changed = False
+    if raw or instance._state.adding or update_fields is not None and not (
+        set(update_fields) & set(availability.FIELDS)
+    ):
+        # Например, last_login при входе: имя и почта не менялись.
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        *availability.FIELDS
+    ).first()
+    instance._identity_changed = old is not None and old != tuple(
+        getattr(instance, field) for field in availability.FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def remember_user(sender, instance, created, **kwargs):
+    if created:
+        availability.remember(instance)
+    elif not getattr(instance, '_identity_changed', False):
+        return
+    transaction.on_commit(lambda: availability.changed(created=created))
+
+
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    """Из фильтра Блума значение не удалить: фильтры перестраиваются."""
+    transaction.on_commit(availability.changed)
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+
+from users import availability
+
+User = get_user_model()
+
+
+class AvailabilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(
+            username='taken', email='taken@example.com'
+        )
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        availability.build()
+        self.url = reverse('users:check_availability')
+
+    def test_endpoint_reports_taken_and_free_values(self):
+        response = self.client.get(
+            self.url, {'username': 'taken', 'email': 'free@example.com'}
+        )
+        self.assertEqual(
+            response.json(), {'username': False, 'email': True}
+        )
+        response = self.client.get(self.url, {'email': 'taken@EXAMPLE.com'})
+        self.assertEqual(response.json(), {'email': False})
+
+    def test_filter_miss_skips_database(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(availability.is_taken('username', 'nobody'))
+
+    def test_new_user_is_added_to_filter(self):
+        User.objects.create_user(username='newcomer')
+        self.assertIn('newcomer', availability.filters['username'])
+        self.assertTrue(availability.is_taken('username', 'newcomer'))
+
+    def test_user_created_in_other_process_is_taken(self):
+        """Другой процесс создал пользователя и увеличил счётчик."""
+        User.objects.bulk_create([User(username='elsewhere')])
+        availability.changed(created=True)
+        # Догоняющий запрос по новым id и проверка попадания.
+        with self.assertNumQueries(2):
+            self.assertTrue(availability.is_taken('username', 'elsewhere'))
+
+    def test_rename_in_other_process_rebuilds_filter(self):
+        User.objects.filter(username='taken').update(username='renamed')
+        availability.changed()
+        self.assertTrue(availability.is_taken('username', 'renamed'))
+
+    @mock.patch('users.signals.transaction.on_commit', lambda func: func())
+    def test_counters_change_only_with_username_or_email(self):
+        user = User.objects.get(username='taken')
+        user.save(update_fields=['last_login'])
+        user.first_name = 'Name'
+        user.save()
+        self.assertEqual(availability.versions(), (0, 0))
+        user.email = 'changed@example.com'
+        user.save()
+        self.assertEqual(availability.versions(), (0, 1))
+        newcomer = User.objects.create_user(username='newcomer')
+        self.assertEqual(availability.versions(), (1, 1))
+        newcomer.delete()
+        self.assertEqual(availability.versions(), (1, 2))
+
+    def test_signup_rejects_taken_email(self):
+        response = self.client.post(reverse('users:signup'), {
+            'username': 'another',
+            'email': 'taken@example.com',
+            'password1': 'Strong-pass-123',
+            'password2': 'Strong-pass-123',
+        })
+        self.assertIn('email', response.context['form'].errors)
+        self.assertFalse(User.objects.filter(username='another').exists())
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Task
+from core.tasks import run_next
+
+User = get_user_model()
+
+
+class PasswordResetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='test-user',
+            email='test@example.com',
+            password='test-password'
+        )
+
+    def test_reset_mail_is_sent_by_worker(self):
+        """Письмо сброса пароля уходит через очередь задач."""
+        self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'test@example.com'}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.filter(queue='mail').count(), 1)
+
+        run_next('mail')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@example.com'])
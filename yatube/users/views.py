@@ -1,10 +1,31 @@
+from django.contrib.auth.views import PasswordResetView
+from django.http import JsonResponse
 from django.urls import reverse_lazy
+from django.views.decorators.http import require_GET
 from django.views.generic import CreateView
 
-from .forms import CreationForm
+from core.ratelimit import ratelimit
+
+from . import availability
+from .forms import CreationForm, QueuedPasswordResetForm
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+class PasswordReset(PasswordResetView):
+    form_class = QueuedPasswordResetForm
+
+
+@require_GET
+@ratelimit('availability')
+def check_availability(request):
+    """Свободны ли ?username= и ?email= для регистрации: {поле: bool}."""
+    return JsonResponse({
+        field: not availability.is_taken(field, request.GET[field])
+        for field in availability.FIELDS
+        if field in request.GET
+    })
@@ -24,15 +24,18 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail'
 ]
 
 MIDDLEWARE = [
+    'core.middleware.SlowLogMiddleware',
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,13 +62,39 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Производственный запуск: воркер прогревается в wsgi.py (core.warmup).
+WSGI_WARMUP = os.environ.get('YATUBE_WSGI_WARMUP') == '1'
+if WSGI_WARMUP:
+    # При DEBUG = True Django не кеширует скомпилированные шаблоны.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader',
+        [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    )]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 20000,
+    'temp_store': 'memory',
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -82,10 +111,34 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 CACHES = {
+    # Свой у каждого воркера: страницы, фрагменты шаблонов, тренды.
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.LocMemCache',
+    },
+    # Общий для всех воркеров: всё, что нельзя сбросить в одном процессе
+    # (сессии, пользователи, подписки, лимиты запросов).
+    'shared': {
+        'BACKEND': 'core.cache.FileCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+# Тесты не должны видеть файлы общего кеша рабочего сервера и оставлять
+# свои: manage.py test подставляет эти кеши через TEST_RUNNER, pytest —
+# через yatube/settings_test.py.
+TEST_CACHES = {
+    alias: {
+        'BACKEND': 'core.cache.LocMemCache',
+        'LOCATION': f'test-{alias}',
     }
+    for alias in CACHES
 }
+TEST_RUNNER = 'core.runner.TestRunner'
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
 
 LANGUAGE_CODE = 'ru'
 
@@ -99,6 +152,11 @@ USE_TZ = True
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_SERVE_PREFIXES = ('posts/', 'cache/')
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+# None, 'x-sendfile' (Apache/lighttpd) или 'x-accel' (nginx).
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
@@ -112,4 +170,82 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 PAGINATOR_COUNT = 10
 
+COMMENT_THREADS_PER_PAGE = 20
+COMMENT_PAGE_LIMIT = 200
+
+FOLLOW_SUGGESTIONS_COUNT = 5
+FOLLOW_POPULAR_LIMIT = 100
+FOLLOW_POPULAR_CACHE_TIMEOUT = 60 * 10
+FOLLOW_CACHE_TIMEOUT = 60 * 5
+# Сколько живёт флаг ждущего пересчёта рекомендаций, если задача
+# так и не запустилась.
+FOLLOW_REFRESH_PENDING_TIMEOUT = 60 * 10
+
+# Прокси перед приложением (nginx): им можно верить в X-Forwarded-For.
+RATELIMIT_TRUSTED_PROXIES = ('127.0.0.1', '::1')
+RATELIMIT_RATES = {
+    'post_create': {'user': '10/m', 'ip': '30/m'},
+    'add_comment': {'user': '20/m', 'ip': '60/m'},
+    'follow': {'user': '30/m', 'ip': '120/m'},
+    'availability': {'user': '60/m', 'ip': '60/m'},
+}
+
+AVAILABILITY_ERROR_RATE = 0.01
+AVAILABILITY_MIN_CAPACITY = 10000
+AVAILABILITY_REBUILD_INTERVAL = 60 * 10
+
+ARCHIVE_AFTER_DAYS = 90
+
+SITE_URL = 'http://localhost:8000'
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_SHARD_SIZE = 50000
+
+TRENDING_SIZE = 100
+TRENDING_HALF_LIFE = 60 * 60 * 12
+TRENDING_CACHE_TIMEOUT = 60
+TRENDING_WEIGHTS = {
+    'post': 1,
+    'comment': 2,
+    'follow': 1,
+    'view': 0.1,
+}
+
+VIEW_FLUSH_INTERVAL = 10
+
+TASK_QUEUES = {
+    'default': 2,
+    'mail': 1,
+}
+TASK_VISIBILITY_TIMEOUT = 60 * 5
+TASK_RETRY_BACKOFF = 10
+
+SLOWLOG_QUERY_MS = 100
+SLOWLOG_REQUEST_MS = 500
+SLOWLOG_SAMPLE_RATE = 0.1
+SLOWLOG_FLUSH_INTERVAL = 60
+SLOWLOG_STACK_DEPTH = 5
+# Каждый процесс пишет в свой файл: logs/slow.<pid>.jsonl.
+SLOWLOG_PATH = os.path.join(BASE_DIR, 'logs', 'slow.jsonl')
+SLOWLOG_MAX_BYTES = 10 * 1024 * 1024
+SLOWLOG_BACKUP_COUNT = 5
+
+WARM_BASE_URL = 'http://127.0.0.1:8000'
+
+# Общий для всех воркеров каталог; очищать при перезапуске сервера.
+METRICS_DIR = os.path.join(BASE_DIR, 'metrics')
+METRICS_FLUSH_INTERVAL = 5
+# Токен для Prometheus; без него /metrics/ доступна только сотрудникам.
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN', '')
+# Токен для потребителей /api/v1/changes/; без него журнал — только
+# сотрудникам.
+CHANGES_TOKEN = os.environ.get('YATUBE_CHANGES_TOKEN', '')
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+METRICS_QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+# Считает миниатюры, построенные и задачей, и тегом {% thumbnail %}.
+THUMBNAIL_BACKEND = 'posts.thumbnails.CountingBackend'
+
+QUERY_PLAN_BASELINE = os.path.join(BASE_DIR, 'queryplans.json')
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
@@ -0,0 +1,5 @@
+"""Настройки для pytest: рабочие настройки с кешами в памяти."""
+from .settings import *  # noqa: F401,F403
+from .settings import TEST_CACHES
+
+CACHES = TEST_CACHES
@@ -8,9 +8,22 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 """
 
 import os
+import time
 
-from django.core.wsgi import get_wsgi_application
+started = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from posts import view_counter  # noqa: E402
+
+if settings.WSGI_WARMUP:
+    from core import warmup
+    warmup.run(imported=time.perf_counter() - started)
+
+view_counter.enable()